@@ -8,16 +8,49 @@ It uses a common Abstract Syntax Tree (AST) format to enable transformations
 and ID mappings.
 """
 
-from typing import Any
+import importlib
+from collections.abc import Iterable
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Any
 
 from .ast.visitor import NodeVisitor, transform_ast
 from .exceptions import ParseError, RenderError, SlackGFMError, TransformError, ValidationError
-from .parsers import parse_gfm, parse_mrkdwn, parse_rich_text
-from .renderers import render_gfm, render_rich_text
-from .transformers import CallbackMapper, IDMapper, apply_id_mappings
+
+if TYPE_CHECKING:
+    from .parsers import parse_gfm, parse_mrkdwn, parse_rich_text
+    from .renderers import render_gfm, render_rich_text
+    from .transformers import CallbackMapper, IDMapper, apply_id_mappings
 
 __version__ = "0.2.0"
 
+# Parsers, renderers and transformers are imported on first use (PEP 562), so
+# callers that only need one conversion direction don't pay for loading the
+# others (the GFM parser pulls in markdown-it-py).
+_LAZY_ATTRS = {
+    "parse_rich_text": "slack_gfm.parsers.rich_text",
+    "parse_gfm": "slack_gfm.parsers.gfm",
+    "parse_mrkdwn": "slack_gfm.parsers.mrkdwn",
+    "render_gfm": "slack_gfm.renderers.gfm",
+    "render_rich_text": "slack_gfm.renderers.rich_text",
+    "apply_id_mappings": "slack_gfm.transformers.mappings",
+    "IDMapper": "slack_gfm.transformers.mappings",
+    "CallbackMapper": "slack_gfm.transformers.mappings",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
+
 __all__ = [
     # Version
     "__version__",
@@ -25,6 +58,7 @@ __all__ = [
     "rich_text_to_gfm",
     "gfm_to_rich_text",
     "mrkdwn_to_gfm",
+    "rich_text_batch_to_gfm",
     # Parsers
     "parse_rich_text",
     "parse_gfm",
@@ -83,11 +117,15 @@ def rich_text_to_gfm(
         >>> print(gfm)
         Hello [@john](slack://user?id=U123&name=john)
     """
+    from .parsers.rich_text import _parse_rich_text_with_stats
+    from .renderers.gfm import render_gfm
+    from .transformers.mappings import apply_id_mappings
+
     # Parse Rich Text to AST
-    ast = parse_rich_text(rich_text_data)
+    ast, stats = _parse_rich_text_with_stats(rich_text_data)
 
-    # Apply ID mappings if provided
-    if user_map or channel_map or usergroup_map:
+    # Apply ID mappings only if a map covers an ID the document mentions
+    if stats.needs_mapping(user_map, channel_map, usergroup_map):
         ast = apply_id_mappings(
             ast, user_map=user_map, channel_map=channel_map, usergroup_map=usergroup_map
         )
@@ -96,6 +134,56 @@ def rich_text_to_gfm(
     return render_gfm(ast)
 
 
+def rich_text_batch_to_gfm(
+    items: Iterable[dict[str, Any] | list[dict[str, Any]]],
+    user_map: dict[str, str] | None = None,
+    channel_map: dict[str, str] | None = None,
+    usergroup_map: dict[str, str] | None = None,
+    workers: int = 1,
+) -> list[str]:
+    """Convert many Slack Rich Text messages to GitHub Flavored Markdown.
+
+    Equivalent to calling rich_text_to_gfm() on each item, but the ID mapper is
+    built once and shared by the whole batch. With workers > 1 the items are
+    converted in a process pool, which helps for large exports since
+    conversion is CPU-bound.
+
+    Args:
+        items: Slack Rich Text JSON values (full blocks or elements arrays)
+        user_map: Optional dictionary mapping user IDs to usernames
+        channel_map: Optional dictionary mapping channel IDs to names
+        usergroup_map: Optional dictionary mapping usergroup IDs to names
+        workers: Number of worker processes (1 converts in the current process)
+
+    Returns:
+        List of GFM strings, in the same order as items
+
+    Example:
+        >>> messages = [
+        ...     [{"type": "rich_text_section", "elements": [{"type": "text", "text": "Hi"}]}],
+        ...     [{"type": "rich_text_section", "elements": [{"type": "user", "user_id": "U1"}]}],
+        ... ]
+        >>> rich_text_batch_to_gfm(messages, user_map={"U1": "john"})
+        ['Hi', '[@john](slack://user?id=U1&name=john)']
+    """
+    from .transformers.mappings import IDMapper
+
+    mapper = None
+    if user_map or channel_map or usergroup_map:
+        mapper = IDMapper(user_map=user_map, channel_map=channel_map, usergroup_map=usergroup_map)
+    convert = partial(_rich_text_item_to_gfm, mapper=mapper)
+
+    if workers <= 1:
+        return [convert(item) for item in items]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    items = list(items)
+    chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(convert, items, chunksize=chunksize))
+
+
 def gfm_to_rich_text(
     gfm_text: str,
     user_map: dict[str, str] | None = None,
@@ -121,11 +209,15 @@ def gfm_to_rich_text(
         >>> rich_text["elements"][0]["elements"][1]
         {'type': 'user', 'user_id': 'U123'}
     """
+    from .parsers.gfm import _parse_gfm_with_stats
+    from .renderers.rich_text import render_rich_text
+    from .transformers.mappings import apply_id_mappings
+
     # Parse GFM to AST
-    ast = parse_gfm(gfm_text)
+    ast, stats = _parse_gfm_with_stats(gfm_text)
 
-    # Apply ID mappings if provided
-    if user_map or channel_map or usergroup_map:
+    # Apply ID mappings only if a map covers an ID the document mentions
+    if stats.needs_mapping(user_map, channel_map, usergroup_map):
         ast = apply_id_mappings(
             ast, user_map=user_map, channel_map=channel_map, usergroup_map=usergroup_map
         )
@@ -159,14 +251,51 @@ def mrkdwn_to_gfm(
         >>> print(gfm)
         **Hello** [@john](slack://user?id=U123&name=john)
     """
+    from .parsers.mrkdwn import _CACHE_MAX_LEN, _parse_mrkdwn_with_stats
+    from .renderers.gfm import render_gfm
+    from .transformers.mappings import apply_id_mappings
+
+    # Without maps the output depends only on the input, so reuse it
+    if not (user_map or channel_map or usergroup_map) and len(mrkdwn_text) <= _CACHE_MAX_LEN:
+        return _mrkdwn_to_gfm_cached(mrkdwn_text)
+
     # Parse mrkdwn to AST
-    ast = parse_mrkdwn(mrkdwn_text)
+    ast, stats = _parse_mrkdwn_with_stats(mrkdwn_text)
 
-    # Apply ID mappings if provided
-    if user_map or channel_map or usergroup_map:
+    # Apply ID mappings only if a map covers an ID the document mentions
+    if stats.needs_mapping(user_map, channel_map, usergroup_map):
         ast = apply_id_mappings(
             ast, user_map=user_map, channel_map=channel_map, usergroup_map=usergroup_map
         )
 
     # Render to GFM
     return render_gfm(ast)
+
+
+@lru_cache(maxsize=1024)
+def _mrkdwn_to_gfm_cached(mrkdwn_text: str) -> str:
+    """Convert mrkdwn that has no ID maps to apply, remembering recent results.
+
+    Parses without the parse cache: later calls for the same text are served
+    from this cache, so keeping the Document there too would only pin memory.
+    """
+    from .parsers.mrkdwn import _parse_mrkdwn_uncached
+    from .renderers.gfm import render_gfm
+
+    ast, _ = _parse_mrkdwn_uncached(mrkdwn_text)
+    return render_gfm(ast)
+
+
+def _rich_text_item_to_gfm(
+    rich_text_data: dict[str, Any] | list[dict[str, Any]], mapper: "IDMapper | None"
+) -> str:
+    """Convert one batch item (module-level so process pools can pickle it)."""
+    from .parsers.rich_text import _parse_rich_text_with_stats
+    from .renderers.gfm import render_gfm
+
+    ast, stats = _parse_rich_text_with_stats(rich_text_data)
+    if mapper is not None and stats.needs_mapping(
+        mapper.user_map, mapper.channel_map, mapper.usergroup_map
+    ):
+        return render_gfm(transform_ast(ast, mapper))
+    return render_gfm(ast)
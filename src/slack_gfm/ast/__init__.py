@@ -5,6 +5,8 @@ for transforming between Slack and GitHub Flavored Markdown formats.
 """
 
 from .nodes import (
+    BLOCK_TYPES,
+    INLINE_TYPES,
     AnyBlock,
     AnyInline,
     AnyNode,
@@ -21,6 +23,7 @@ from .nodes import (
     HorizontalRule,
     InlineNode,
     Italic,
+    Kind,
     Link,
     List,
     ListItem,
@@ -32,6 +35,11 @@ from .nodes import (
     Text,
     UsergroupMention,
     UserMention,
+    coalesce_text,
+    make_broadcast,
+    make_emoji,
+    make_hr,
+    make_text,
 )
 from .visitor import NodeVisitor, transform_ast
 
@@ -68,6 +76,16 @@ __all__ = [
     "AnyNode",
     "AnyInline",
     "AnyBlock",
+    # Runtime type tuples
+    "INLINE_TYPES",
+    "BLOCK_TYPES",
+    "Kind",
+    # Shared leaf factories
+    "make_text",
+    "make_emoji",
+    "make_broadcast",
+    "make_hr",
+    "coalesce_text",
     # Visitor pattern
     "NodeVisitor",
     "transform_ast",
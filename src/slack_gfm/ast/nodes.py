@@ -4,29 +4,47 @@ This module defines the Abstract Syntax Tree (AST) nodes used to represent
 formatted text from Slack (Mrkdwn, Rich Text) and GitHub Flavored Markdown.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Any, ClassVar, cast
 
 # Base classes
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Node:
     """Base class for all AST nodes.
 
-    All nodes are immutable (frozen) for safety in concurrent environments.
+    All nodes are immutable (frozen) for safety in concurrent environments, and
+    use __slots__ to keep per-instance memory down on large documents.
     """
 
-    pass
+    # Whether this node class has a `children` field; lets traversal skip leaves
+    # without an attribute lookup per node
+    _HAS_CHILDREN: ClassVar[bool] = False
+
+    # Small integer tag used for table-based dispatch (see Kind). Every new
+    # subclass starts at -1 so subclasses of built-in nodes don't inherit
+    # their parent's tag; only the library's own classes get a real one.
+    KIND: ClassVar[int] = -1
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        # slots=True recreates the class, which breaks zero-argument super()
+        super(Node, cls).__init_subclass__(**kwargs)
+        cls.KIND = -1
+        cls._HAS_CHILDREN = any(
+            "children" in vars(c).get("__annotations__", {}) for c in cls.__mro__
+        )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class InlineNode(Node):
     """Base class for inline-level nodes (can appear within a paragraph)."""
 
     pass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BlockNode(Node):
     """Base class for block-level nodes (standalone blocks like paragraphs, lists, quotes)."""
 
@@ -36,7 +54,7 @@ class BlockNode(Node):
 # Document structure
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Document(Node):
     """Root node containing all content blocks."""
 
@@ -46,42 +64,42 @@ class Document(Node):
 # Inline nodes
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Text(InlineNode):
     """Plain text node."""
 
     content: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Bold(InlineNode):
     """Bold text."""
 
     children: list[InlineNode] = field(default_factory=list)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Italic(InlineNode):
     """Italic text."""
 
     children: list[InlineNode] = field(default_factory=list)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Strikethrough(InlineNode):
     """Strikethrough text."""
 
     children: list[InlineNode] = field(default_factory=list)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Code(InlineNode):
     """Inline code."""
 
     content: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Link(InlineNode):
     """Hyperlink with optional text content.
 
@@ -96,7 +114,7 @@ class Link(InlineNode):
     children: list[InlineNode] = field(default_factory=list)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class UserMention(InlineNode):
     """Slack user mention.
 
@@ -109,7 +127,7 @@ class UserMention(InlineNode):
     username: str | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ChannelMention(InlineNode):
     """Slack channel mention.
 
@@ -122,7 +140,7 @@ class ChannelMention(InlineNode):
     channel_name: str | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class UsergroupMention(InlineNode):
     """Slack usergroup mention.
 
@@ -135,7 +153,7 @@ class UsergroupMention(InlineNode):
     usergroup_name: str | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Broadcast(InlineNode):
     """Slack broadcast notification.
 
@@ -146,7 +164,7 @@ class Broadcast(InlineNode):
     range: str  # "here", "channel", "everyone"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Emoji(InlineNode):
     """Emoji.
 
@@ -159,7 +177,7 @@ class Emoji(InlineNode):
     unicode: str | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DateTimestamp(InlineNode):
     """Slack date/time formatting.
 
@@ -177,14 +195,14 @@ class DateTimestamp(InlineNode):
 # Block nodes
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Paragraph(BlockNode):
     """Paragraph containing inline content."""
 
     children: list[InlineNode] = field(default_factory=list)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Heading(BlockNode):
     """Heading with level (1-6)."""
 
@@ -192,7 +210,7 @@ class Heading(BlockNode):
     children: list[InlineNode] = field(default_factory=list)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CodeBlock(BlockNode):
     """Code block with optional language."""
 
@@ -200,14 +218,14 @@ class CodeBlock(BlockNode):
     language: str | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Quote(BlockNode):
     """Block quote."""
 
     children: list[BlockNode] = field(default_factory=list)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class List(BlockNode):
     """List (ordered or unordered).
 
@@ -222,7 +240,7 @@ class List(BlockNode):
     start: int = 1
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ListItem(Node):
     """List item.
 
@@ -232,14 +250,14 @@ class ListItem(Node):
     children: list[InlineNode | BlockNode] = field(default_factory=list)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class HorizontalRule(BlockNode):
     """Horizontal rule / divider."""
 
     pass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Table(BlockNode):
     """Table (GFM extension).
 
@@ -273,3 +291,175 @@ AnyInline = (
     | DateTimestamp
 )
 AnyBlock = BlockNode | Paragraph | Heading | CodeBlock | Quote | List | HorizontalRule | Table
+
+# Runtime counterparts of the aliases above, for membership checks.
+# `type(node) in _INLINE_SET` is a hash lookup rather than an MRO walk;
+# fall back to isinstance() for subclasses defined outside the library.
+INLINE_TYPES: tuple[type[InlineNode], ...] = (
+    Text,
+    Bold,
+    Italic,
+    Strikethrough,
+    Code,
+    Link,
+    UserMention,
+    ChannelMention,
+    UsergroupMention,
+    Broadcast,
+    Emoji,
+    DateTimestamp,
+)
+BLOCK_TYPES: tuple[type[BlockNode], ...] = (
+    Paragraph,
+    Heading,
+    CodeBlock,
+    Quote,
+    List,
+    HorizontalRule,
+    Table,
+)
+_INLINE_SET = frozenset(INLINE_TYPES)
+
+
+class Kind:
+    """Integer tags for the built-in node classes, available as `Node.KIND`.
+
+    Visitors and renderers can dispatch through a tuple indexed by `node.KIND`
+    instead of hashing the node's type. Nodes of any other class have KIND -1.
+    """
+
+    TEXT = 0
+    BOLD = 1
+    ITALIC = 2
+    STRIKETHROUGH = 3
+    CODE = 4
+    LINK = 5
+    USER_MENTION = 6
+    CHANNEL_MENTION = 7
+    USERGROUP_MENTION = 8
+    BROADCAST = 9
+    EMOJI = 10
+    DATE_TIMESTAMP = 11
+    PARAGRAPH = 12
+    HEADING = 13
+    CODE_BLOCK = 14
+    QUOTE = 15
+    LIST = 16
+    HORIZONTAL_RULE = 17
+    TABLE = 18
+    LIST_ITEM = 19
+    DOCUMENT = 20
+
+
+# Node classes in Kind order: a class's KIND is its index in this tuple
+_KIND_CLASSES: tuple[type[Node], ...] = (*INLINE_TYPES, *BLOCK_TYPES, ListItem, Document)
+for _kind, _node_cls in enumerate(_KIND_CLASSES):
+    _node_cls.KIND = _kind
+del _kind, _node_cls
+
+
+# Shared instances for small leaf nodes
+#
+# Nodes are frozen, so identical leaves can safely be shared between documents.
+# Parsers build leaves through these factories to avoid allocating the same
+# short strings, emoji and broadcasts over and over.
+
+# Text longer than this is not worth keeping alive in the cache
+_TEXT_INTERN_MAX_LEN = 32
+
+
+@lru_cache(maxsize=4096)
+def _cached_text(content: str) -> Text:
+    return Text(content=content)
+
+
+# Pinned outside the LRU so heavy traffic can never evict them: line breaks,
+# spaces and the unmatched formatting markers the parsers emit as literal text
+_COMMON_TEXT = {content: Text(content=content) for content in ("", "\n", " ", "*", "_", "~")}
+
+
+def make_text(content: str) -> Text:
+    """Return a Text node, reusing a shared instance for short content."""
+    if len(content) <= _TEXT_INTERN_MAX_LEN:
+        return _COMMON_TEXT.get(content) or _cached_text(content)
+    return Text(content=content)
+
+
+@lru_cache(maxsize=1024)
+def make_emoji(name: str, unicode: str | None = None) -> Emoji:
+    """Return a shared Emoji node."""
+    return Emoji(name=name, unicode=unicode)
+
+
+_BROADCASTS = {name: Broadcast(range=name) for name in ("here", "channel", "everyone")}
+
+
+def make_broadcast(range: str) -> Broadcast:
+    """Return a Broadcast node, shared for the standard ranges."""
+    return _BROADCASTS.get(range) or Broadcast(range=range)
+
+
+_HORIZONTAL_RULE = HorizontalRule()
+
+
+def make_hr() -> HorizontalRule:
+    """Return the shared HorizontalRule node."""
+    return _HORIZONTAL_RULE
+
+
+def _copy_tree[N: Node](node: N) -> N:
+    """Return a copy of a tree in which every list is a new object.
+
+    Nodes are frozen but their children lists are not, so a tree that is
+    shared (say, by a parse cache) must be copied before callers get it.
+    Leaf nodes hold only immutable values and are reused as they are.
+    """
+    if node._HAS_CHILDREN:
+        children = cast(Any, node).children
+        copied = [_copy_tree(child) for child in children]
+        return cast(
+            N,
+            replace(cast(Any, node), children=copied if type(children) is list else tuple(copied)),
+        )
+    if type(node) is Table:
+        table = cast(Table, node)
+        return cast(
+            N,
+            replace(
+                table,
+                header=[[_copy_tree(n) for n in cell] for cell in table.header],
+                rows=[[[_copy_tree(n) for n in cell] for cell in row] for row in table.rows],
+                alignments=list(table.alignments),
+            ),
+        )
+    return node
+
+
+def coalesce_text[N: Node](children: list[N]) -> list[N]:
+    """Merge each run of adjacent Text nodes into a single Text node.
+
+    Parsers often emit runs like Text("Hello "), Text("world"); merging them
+    keeps the AST smaller for every later traversal and render. Merged text
+    goes through make_text(), so short results are still shared.
+    """
+    if len(children) < 2:
+        return children
+    out: list[N] = []
+    run: list[Text] = []
+    for child in children:
+        if type(child) is Text:
+            run.append(cast(Text, child))
+            continue
+        if run:
+            out.append(_merge_run(run))
+            run = []
+        out.append(child)
+    if run:
+        out.append(_merge_run(run))
+    return out
+
+
+def _merge_run(run: list[Text]) -> Any:
+    if len(run) == 1:
+        return run[0]
+    return make_text("".join(t.content for t in run))
@@ -1,6 +1,11 @@
 """Visitor pattern implementation for AST traversal and transformation."""
 
+from collections.abc import Callable, Sequence
+from dataclasses import replace
+from typing import Any, cast
+
 from .nodes import (
+    _KIND_CLASSES,
     AnyNode,
     Bold,
     Broadcast,
@@ -44,28 +49,62 @@ class NodeVisitor:
                 return node
     """
 
+    # Maps node class -> unbound visit_* method, built once per visitor class
+    _DISPATCH: dict[type, Callable[[Any, Any], AnyNode]]
+    # The same methods indexed by Node.KIND; the last slot (KIND -1) resolves
+    # node classes outside the library through _DISPATCH
+    _TABLE: tuple[Callable[[Any, Any], AnyNode], ...]
+    # True when nothing that can run on a table cell is overridden, so
+    # visit_table can return the table without walking its cells
+    _TABLE_SAFE: bool
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._DISPATCH = _build_dispatch(cls)
+        cls._TABLE = _build_table(cls)
+        cls._TABLE_SAFE = _is_table_safe(cls)
+
     def visit(self, node: AnyNode) -> AnyNode:
-        """Visit a node and dispatch to the appropriate visit_* method."""
-        method_name = f"visit_{node.__class__.__name__.lower()}"
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        """Visit a node and dispatch to the appropriate visit_* method.
+
+        The visit_* method for every built-in node class is resolved when the
+        visitor class is created, so dispatch is a single tuple index.
+        """
+        return self._TABLE[node.KIND](self, node)
+
+    @classmethod
+    def _resolve_visit(cls, node_cls: type) -> Callable[[Any, Any], AnyNode]:
+        """Resolve and cache the visit_* method for a node class not seen before.
+
+        Walks the node class's MRO so that a subclass of a built-in node (say,
+        of Text) without its own visit_* method falls back to its parent's.
+        """
+        for base in node_cls.__mro__:
+            method = getattr(cls, f"visit_{base.__name__.lower()}", None)
+            if method is not None:
+                break
+        else:
+            method = cls.generic_visit
+        cls._DISPATCH[node_cls] = method
+        return cast(Callable[[Any, Any], AnyNode], method)
 
     def generic_visit(self, node: AnyNode) -> AnyNode:
         """Default visitor for nodes without specific visit_* methods.
 
         Recursively visits all children.
-        Since nodes are frozen (immutable), we create a new node with transformed children.
+        Since nodes are frozen (immutable), we create a new node with transformed children,
+        but only when at least one child came back as a different object.
         """
-        if hasattr(node, "children") and node.children:
-            from dataclasses import replace
-            from typing import Any, cast
-
-            new_children = [self.visit(child) for child in node.children]
-            # Only create a new node if children actually changed
-            if new_children != list(node.children):
-                # We've checked hasattr, so this is safe at runtime
-                return cast(AnyNode, replace(cast(Any, node), children=new_children))
-        return node
+        if not node._HAS_CHILDREN:
+            return node
+        children = cast(Any, node).children
+        if not children:
+            return node
+        new_children = _visit_children(self, children)
+        if new_children is None:
+            return node
+        # Only nodes with a children field get here
+        return cast(AnyNode, replace(cast(Any, node), children=new_children))
 
     # Visitor methods for each node type
     # Override these in subclasses for custom behavior
@@ -152,31 +191,135 @@ class NodeVisitor:
 
     def visit_table(self, node: Table) -> Table:
         """Visit a Table node."""
-        from dataclasses import replace
-        from typing import cast
-
-        from .nodes import InlineNode
+        if self._TABLE_SAFE:
+            return node
 
-        # Tables have nested structure - visit cells
+        # Tables have nested structure - visit cells, copying rows only on change
         new_header = node.header
         new_rows = node.rows
 
-        if node.header:
-            new_header = [
-                [cast(InlineNode, self.visit(cell)) for cell in row] for row in node.header
-            ]
-        if node.rows:
-            new_rows = [
-                [[cast(InlineNode, self.visit(cell)) for cell in row_cells] for row_cells in row]
-                for row in node.rows
-            ]
+        changed_header = None
+        for i, cell in enumerate(node.header):
+            new_cell = _visit_children(self, cell)
+            if new_cell is not None or changed_header is not None:
+                if changed_header is None:
+                    changed_header = list(node.header[:i])
+                changed_header.append(cell if new_cell is None else new_cell)
+        if changed_header is not None:
+            new_header = changed_header
+
+        changed_rows = None
+        for i, row in enumerate(node.rows):
+            new_row = None
+            for j, cell in enumerate(row):
+                new_cell = _visit_children(self, cell)
+                if new_cell is not None or new_row is not None:
+                    if new_row is None:
+                        new_row = list(row[:j])
+                    new_row.append(cell if new_cell is None else new_cell)
+            if new_row is not None or changed_rows is not None:
+                if changed_rows is None:
+                    changed_rows = list(node.rows[:i])
+                changed_rows.append(row if new_row is None else new_row)
+        if changed_rows is not None:
+            new_rows = changed_rows
 
         # Only create new node if something changed
-        if new_header != node.header or new_rows != node.rows:
+        if new_header is not node.header or new_rows is not node.rows:
             return replace(node, header=new_header, rows=new_rows)
         return node
 
 
+def _build_dispatch(cls: type[NodeVisitor]) -> dict[type, Callable[[Any, Any], AnyNode]]:
+    """Build the node class -> visit_* method table for a visitor class."""
+    return {
+        node_cls: getattr(cls, f"visit_{node_cls.__name__.lower()}", cls.generic_visit)
+        for node_cls in _KIND_CLASSES
+    }
+
+
+def _build_table(cls: type[NodeVisitor]) -> tuple[Callable[[Any, Any], AnyNode], ...]:
+    """Build the Node.KIND-indexed method table for a visitor class."""
+    return (*(cls._DISPATCH[node_cls] for node_cls in _KIND_CLASSES), _visit_unknown)
+
+
+def _visit_unknown(visitor: NodeVisitor, node: AnyNode) -> AnyNode:
+    """Dispatch a node whose class has no KIND of its own."""
+    method = visitor._DISPATCH.get(type(node)) or visitor._resolve_visit(type(node))
+    return method(visitor, node)
+
+
+# Methods that can never be reached from a table cell, which only holds inlines
+_BLOCK_VISITS = frozenset(
+    {
+        "visit_document",
+        "visit_paragraph",
+        "visit_heading",
+        "visit_codeblock",
+        "visit_quote",
+        "visit_list",
+        "visit_listitem",
+        "visit_horizontalrule",
+        "visit_table",
+    }
+)
+
+
+def _is_table_safe(cls: type[NodeVisitor]) -> bool:
+    """Check whether a visitor class leaves every table cell unchanged.
+
+    Any visit_* method that could see an inline node must be NodeVisitor's own,
+    including ones for node classes defined outside the library, and neither
+    visit nor generic_visit may be overridden.
+    """
+    if cls.visit is not NodeVisitor.visit or cls.generic_visit is not NodeVisitor.generic_visit:
+        return False
+    return all(
+        getattr(cls, name) is getattr(NodeVisitor, name, None)
+        for name in dir(cls)
+        if name.startswith("visit_") and name not in _BLOCK_VISITS
+    )
+
+
+NodeVisitor._DISPATCH = _build_dispatch(NodeVisitor)
+NodeVisitor._TABLE = _build_table(NodeVisitor)
+NodeVisitor._TABLE_SAFE = True
+
+# Default visit_* methods that do nothing but visit the node's children
+_PASS_THROUGH = frozenset(
+    {
+        NodeVisitor.generic_visit,
+        NodeVisitor.visit_document,
+        NodeVisitor.visit_paragraph,
+        NodeVisitor.visit_heading,
+        NodeVisitor.visit_bold,
+        NodeVisitor.visit_italic,
+        NodeVisitor.visit_strikethrough,
+        NodeVisitor.visit_link,
+        NodeVisitor.visit_quote,
+        NodeVisitor.visit_list,
+        NodeVisitor.visit_listitem,
+    }
+)
+
+
+def _visit_children(visitor: NodeVisitor, children: Sequence[Any]) -> list[Any] | None:
+    """Visit each child, returning a new list only if any child was replaced.
+
+    Returns None when every child came back as the same object, so callers can
+    keep the original node without allocating anything.
+    """
+    new_children: list[Any] | None = None
+    for i, child in enumerate(children):
+        result = visitor.visit(child)
+        if new_children is not None:
+            new_children.append(result)
+        elif result is not child:
+            new_children = list(children[:i])
+            new_children.append(result)
+    return new_children
+
+
 def transform_ast(root: AnyNode, visitor: NodeVisitor) -> AnyNode:
     """Transform an AST using the given visitor.
 
@@ -199,4 +342,50 @@ def transform_ast(root: AnyNode, visitor: NodeVisitor) -> AnyNode:
         >>> doc = Document(children=[Paragraph(children=[UserMention(user_id="U123")])])
         >>> transformed = transform_ast(doc, UserMapper())
     """
-    return visitor.visit(root)
+    visitor_cls = type(visitor)
+    if (
+        visitor_cls.visit is not NodeVisitor.visit
+        or visitor_cls.generic_visit is not NodeVisitor.generic_visit
+    ):
+        # A custom visit or generic_visit may do anything, so let the visitor
+        # recurse itself
+        return visitor.visit(root)
+
+    # Walk the tree with an explicit stack instead of recursing through
+    # visit_* -> generic_visit -> visit. Container nodes whose visit_* method is
+    # the default pass-through are handled here; anything the visitor
+    # overrides is handed to the visitor as a whole subtree, so the result is
+    # the same as visitor.visit(root).
+    table = visitor._TABLE
+    dispatch = visitor._DISPATCH
+    resolve = visitor._resolve_visit
+    stack: list[tuple[Any, bool]] = [(root, False)]
+    results: list[Any] = []
+    while stack:
+        node, combine = stack.pop()
+        if combine:
+            # All children of this node have been transformed onto the results stack
+            children = node.children
+            start = len(results) - len(children)
+            # Compare in place so an unchanged node allocates nothing; the
+            # slice is only taken when it becomes the new children list
+            for i, old in enumerate(children, start):
+                if results[i] is not old:
+                    node = replace(node, children=results[start:])
+                    break
+            del results[start:]
+            results.append(node)
+            continue
+
+        kind = node.KIND
+        if kind >= 0:
+            method = table[kind]
+        else:
+            method = dispatch.get(type(node)) or resolve(type(node))
+        if node._HAS_CHILDREN and node.children and method in _PASS_THROUGH:
+            children = node.children
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children))
+        else:
+            results.append(method(visitor, node))
+    return cast(AnyNode, results[0])
@@ -1,7 +1,31 @@
 """Parsers for converting various formats to AST."""
 
-from .gfm import parse_gfm
-from .mrkdwn import parse_mrkdwn
-from .rich_text import parse_rich_text
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .gfm import parse_gfm
+    from .mrkdwn import parse_mrkdwn
+    from .rich_text import parse_rich_text
 
 __all__ = ["parse_gfm", "parse_mrkdwn", "parse_rich_text"]
+
+# Each parser is imported on first use; the GFM parser pulls in markdown-it-py
+_LAZY_ATTRS = {
+    "parse_gfm": "slack_gfm.parsers.gfm",
+    "parse_mrkdwn": "slack_gfm.parsers.mrkdwn",
+    "parse_rich_text": "slack_gfm.parsers.rich_text",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -0,0 +1,76 @@
+"""Bookkeeping the parsers do on the side while building an AST.
+
+The convenience functions use this to skip the ID-mapping pass when a
+document doesn't reference any of the mapped IDs.
+"""
+
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+
+@dataclass(slots=True)
+class ParseStats:
+    """Slack IDs referenced by mention nodes in a parsed document."""
+
+    mentioned_users: set[str] = field(default_factory=set)
+    mentioned_channels: set[str] = field(default_factory=set)
+    mentioned_usergroups: set[str] = field(default_factory=set)
+
+    def needs_mapping(
+        self,
+        user_map: Mapping[str, str] | None = None,
+        channel_map: Mapping[str, str] | None = None,
+        usergroup_map: Mapping[str, str] | None = None,
+    ) -> bool:
+        """Return True if any of the maps has an entry for a mentioned ID."""
+        return bool(
+            (user_map and not self.mentioned_users.isdisjoint(user_map))
+            or (channel_map and not self.mentioned_channels.isdisjoint(channel_map))
+            or (usergroup_map and not self.mentioned_usergroups.isdisjoint(usergroup_map))
+        )
+
+
+_current_stats: ContextVar[ParseStats | None] = ContextVar("slack_gfm_parse_stats", default=None)
+
+
+@contextmanager
+def collect_stats() -> Iterator[ParseStats]:
+    """Collect stats for every parse run inside the with-block."""
+    stats = ParseStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def merge_stats(stats: ParseStats) -> None:
+    """Add stats from an earlier parse (e.g. a cached one) to the active collection."""
+    current = _current_stats.get()
+    if current is not None and current is not stats:
+        current.mentioned_users |= stats.mentioned_users
+        current.mentioned_channels |= stats.mentioned_channels
+        current.mentioned_usergroups |= stats.mentioned_usergroups
+
+
+def record_user(user_id: str) -> None:
+    """Note a user mention, if stats are being collected."""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.mentioned_users.add(user_id)
+
+
+def record_channel(channel_id: str) -> None:
+    """Note a channel mention, if stats are being collected."""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.mentioned_channels.add(channel_id)
+
+
+def record_usergroup(usergroup_id: str) -> None:
+    """Note a usergroup mention, if stats are being collected."""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.mentioned_usergroups.add(usergroup_id)
@@ -3,7 +3,12 @@
 Converts GFM string to AST using markdown-it-py.
 """
 
-from urllib.parse import parse_qs, urlparse
+import re
+import threading
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any
+from urllib.parse import unquote
 
 from markdown_it import MarkdownIt
 from markdown_it.token import Token
@@ -12,14 +17,12 @@ from ..ast import (
     AnyBlock,
     AnyInline,
     Bold,
-    Broadcast,
     ChannelMention,
     Code,
     CodeBlock,
     DateTimestamp,
     Document,
     Heading,
-    HorizontalRule,
     Italic,
     Link,
     List,
@@ -27,10 +30,35 @@ from ..ast import (
     Paragraph,
     Quote,
     Strikethrough,
-    Text,
     UsergroupMention,
     UserMention,
+    coalesce_text,
+    make_broadcast,
+    make_hr,
+    make_text,
 )
+from ..ast.nodes import _copy_tree
+from ._stats import (
+    ParseStats,
+    collect_stats,
+    merge_stats,
+    record_channel,
+    record_user,
+    record_usergroup,
+)
+
+# One configured MarkdownIt per thread. Building it loads and compiles every
+# rule chain, which costs more than parsing a typical short message.
+_thread_local = threading.local()
+
+
+def _get_markdown() -> MarkdownIt:
+    """Return this thread's MarkdownIt instance, creating it on first use."""
+    md: MarkdownIt | None = getattr(_thread_local, "md", None)
+    if md is None:
+        md = MarkdownIt("gfm-like").enable(["table", "strikethrough"])
+        _thread_local.md = md
+    return md
 
 
 def parse_gfm(gfm_text: str) -> Document:
@@ -48,68 +76,140 @@ def parse_gfm(gfm_text: str) -> Document:
         >>> gfm = "**Hello** world"
         >>> doc = parse_gfm(gfm)
     """
-    md = MarkdownIt("gfm-like").enable(["table", "strikethrough"])
-    tokens = md.parse(gfm_text)
-    return _parse_tokens(tokens)
+    doc, stats = _parse_gfm_with_stats(gfm_text)
+    merge_stats(stats)
+    if len(gfm_text) <= _CACHE_MAX_LEN:
+        # Cached trees are shared with later calls; hand out lists of its own
+        return _copy_tree(doc)
+    return doc
+
+
+# Longer inputs are parsed every time rather than kept alive as cache keys
+_CACHE_MAX_LEN = 4096
+
+
+def _parse_gfm_with_stats(gfm_text: str) -> tuple[Document, ParseStats]:
+    """Parse GFM to AST, also returning the mention IDs it references.
+
+    Results for short inputs are cached, so the returned Document may be
+    shared with other callers. Its children lists must not be modified (copy
+    it with _copy_tree first), and neither must the stats.
+    """
+    if _is_plain_text(gfm_text):
+        return Document(children=[Paragraph(children=[make_text(gfm_text)])]), ParseStats()
+    if len(gfm_text) <= _CACHE_MAX_LEN:
+        return _parse_gfm_cached(gfm_text)
+    return _parse_gfm_uncached(gfm_text)
+
+
+# Anything markdown-it could treat as syntax: block and inline markers, HTML,
+# entities and escapes, list numbering, the ".", ":" and "@" that linkify
+# needs for bare URLs and emails, and characters it normalises (\r, NUL)
+_MARKUP_CHARS = re.compile(r"[\n\r\t\x00*_`~\[\]<>#&\\!|.:@+\-=()]")
+
+
+def _is_plain_text(gfm_text: str) -> bool:
+    """Check whether text would parse to a single paragraph of itself.
+
+    Most chat messages are a short line with no markdown at all; for those,
+    running markdown-it only to get the text back is wasted work.
+    """
+    return (
+        bool(gfm_text)
+        and not gfm_text[0].isspace()
+        and not gfm_text[-1].isspace()
+        and _MARKUP_CHARS.search(gfm_text) is None
+    )
+
+
+def _parse_gfm_uncached(gfm_text: str) -> tuple[Document, ParseStats]:
+    """Parse GFM to AST and stats, bypassing the cache."""
+    with collect_stats() as stats:
+        tokens = _get_markdown().parse(gfm_text)
+        return _parse_tokens(tokens), stats
+
+
+_parse_gfm_cached = lru_cache(maxsize=256)(_parse_gfm_uncached)
 
 
 def _parse_tokens(tokens: list[Token]) -> Document:
-    """Parse markdown-it tokens into Document AST."""
+    """Parse markdown-it tokens into Document AST.
+
+    Nested blocks are handled with an explicit stack of open containers
+    rather than recursion, so deep nesting can't hit the recursion limit.
+    Each frame is (index of the opening token, children so far, index of the
+    closing token, whether the container is a list item); the container node
+    is built once its frame is done. The root frame has no opening token.
+    """
+    close_map = _build_close_map(tokens)
     blocks: list[AnyBlock] = []
+    stack: list[tuple[int, list[Any], int, bool]] = [(-1, blocks, len(tokens), False)]
+    # Hoisted out of the loop, which runs once per block token
+    get_handler = _BLOCK_HANDLERS.get
+    containers = _CONTAINER_OPENERS
     i = 0
-    while i < len(tokens):
-        block, consumed = _parse_block_token(tokens, i)
-        if block:
-            blocks.append(block)
-        i += consumed
+    while True:
+        open_idx, children, end, in_list_item = stack[-1]
+        if i >= end:
+            stack.pop()
+            if not stack:
+                break
+            stack[-1][1].append(_build_container(tokens[open_idx], children))
+            i = end + 1
+            continue
+
+        token_type = tokens[i].type
+        if token_type in containers:
+            stack.append((i, [], close_map[i], token_type == "list_item_open"))
+            i += 1
+        elif token_type == "paragraph_open" and in_list_item:
+            # For list items, extract inline content directly
+            para, consumed = _parse_paragraph(tokens, i)
+            children.extend(para.children)
+            i += consumed
+        else:
+            handler = get_handler(token_type)
+            if handler is None:
+                # Unknown or already handled
+                i += 1
+                continue
+            block, consumed = handler(tokens, i)
+            children.append(block)
+            i += consumed
 
     return Document(children=blocks)
 
 
-def _parse_block_token(tokens: list[Token], start_idx: int) -> tuple[AnyBlock | None, int]:
-    """Parse a block-level token.
+# Block tokens whose content is parsed as child blocks
+_CONTAINER_OPENERS = frozenset(
+    {"blockquote_open", "bullet_list_open", "ordered_list_open", "list_item_open"}
+)
 
-    Returns:
-        (block_node, tokens_consumed)
-    """
-    token = tokens[start_idx]
-
-    if token.type == "heading_open":
-        return _parse_heading(tokens, start_idx)
-    elif token.type == "paragraph_open":
-        return _parse_paragraph(tokens, start_idx)
-    elif token.type == "fence" or token.type == "code_block":
-        return _parse_code_block(token), 1
-    elif token.type == "blockquote_open":
-        return _parse_blockquote(tokens, start_idx)
-    elif token.type == "bullet_list_open" or token.type == "ordered_list_open":
-        return _parse_list(tokens, start_idx)
-    elif token.type == "hr":
-        return HorizontalRule(), 1
-    else:
-        # Unknown or already handled
-        return None, 1
+
+def _build_container(open_token: Token, children: list[Any]) -> AnyBlock | ListItem:
+    """Build the node for a finished container from its opening token and children."""
+    if open_token.type == "blockquote_open":
+        return Quote(children=children)
+    if open_token.type == "list_item_open":
+        return ListItem(children=coalesce_text(children))
+    return List(ordered=open_token.type == "ordered_list_open", children=children)
 
 
 def _parse_heading(tokens: list[Token], start_idx: int) -> tuple[Heading, int]:
     """Parse heading tokens."""
-    heading_open = tokens[start_idx]
-    level = int(heading_open.tag[1])  # h1 -> 1, h2 -> 2, etc.
+    level = _HEADING_LEVELS[tokens[start_idx].tag]
+    # markdown-it always emits heading_open, inline, heading_close
+    inlines = _parse_inline_tokens(tokens[start_idx + 1])
+    return Heading(level=level, children=inlines), 3
 
-    # Find inline content and closing tag
-    inline_idx = start_idx + 1
-    inlines = _parse_inline_tokens(tokens[inline_idx]) if inline_idx < len(tokens) else []
 
-    # heading_open, inline, heading_close = 3 tokens
-    return Heading(level=level, children=inlines), 3
+_HEADING_LEVELS = {f"h{level}": level for level in range(1, 7)}
 
 
 def _parse_paragraph(tokens: list[Token], start_idx: int) -> tuple[Paragraph, int]:
     """Parse paragraph tokens."""
-    # paragraph_open, inline, paragraph_close
-    inline_idx = start_idx + 1
-    inlines = _parse_inline_tokens(tokens[inline_idx]) if inline_idx < len(tokens) else []
-
+    # markdown-it always emits paragraph_open, inline, paragraph_close
+    inlines = _parse_inline_tokens(tokens[start_idx + 1])
     return Paragraph(children=inlines), 3
 
 
@@ -122,70 +222,24 @@ def _parse_code_block(token: Token) -> CodeBlock:
     return CodeBlock(content=content, language=language)
 
 
-def _parse_blockquote(tokens: list[Token], start_idx: int) -> tuple[Quote, int]:
-    """Parse blockquote tokens."""
-    # Find matching close token
-    close_idx = _find_closing_token(tokens, start_idx, "blockquote_open", "blockquote_close")
-
-    # Parse children
-    children: list[AnyBlock] = []
-    i = start_idx + 1
-    while i < close_idx:
-        block, consumed = _parse_block_token(tokens, i)
-        if block:
-            children.append(block)
-        i += consumed
-
-    consumed_total = close_idx - start_idx + 1
-    return Quote(children=children), consumed_total
-
-
-def _parse_list(tokens: list[Token], start_idx: int) -> tuple[List, int]:
-    """Parse list tokens."""
-    list_open = tokens[start_idx]
-    ordered = list_open.type == "ordered_list_open"
-
-    # Find closing token
-    close_type = "ordered_list_close" if ordered else "bullet_list_close"
-    close_idx = _find_closing_token(tokens, start_idx, list_open.type, close_type)
-
-    # Parse list items
-    items: list[ListItem] = []
-    i = start_idx + 1
-    while i < close_idx:
-        if tokens[i].type == "list_item_open":
-            item, consumed = _parse_list_item(tokens, i)
-            items.append(item)
-            i += consumed
-        else:
-            i += 1
-
-    consumed_total = close_idx - start_idx + 1
-    return List(ordered=ordered, children=items), consumed_total
+def _parse_code_block_token(tokens: list[Token], start_idx: int) -> tuple[CodeBlock, int]:
+    """Parse a fence or indented code block token."""
+    return _parse_code_block(tokens[start_idx]), 1
 
 
-def _parse_list_item(tokens: list[Token], start_idx: int) -> tuple[ListItem, int]:
-    """Parse list item tokens."""
-    # Find closing token
-    close_idx = _find_closing_token(tokens, start_idx, "list_item_open", "list_item_close")
+def _parse_hr(tokens: list[Token], start_idx: int) -> tuple[AnyBlock, int]:
+    """Parse a thematic break token."""
+    return make_hr(), 1
 
-    # Parse children (can be paragraphs or other blocks)
-    children: list[AnyInline | AnyBlock] = []
-    i = start_idx + 1
-    while i < close_idx:
-        if tokens[i].type == "paragraph_open":
-            para, consumed = _parse_paragraph(tokens, i)
-            # For list items, extract inline content directly
-            children.extend(para.children)
-            i += consumed
-        else:
-            block, consumed = _parse_block_token(tokens, i)
-            if block:
-                children.append(block)
-            i += consumed
 
-    consumed_total = close_idx - start_idx + 1
-    return ListItem(children=children), consumed_total
+# Leaf block token type -> handler returning (block_node, tokens_consumed)
+_BLOCK_HANDLERS: dict[str, Callable[[list[Token], int], tuple[AnyBlock, int]]] = {
+    "heading_open": _parse_heading,
+    "paragraph_open": _parse_paragraph,
+    "fence": _parse_code_block_token,
+    "code_block": _parse_code_block_token,
+    "hr": _parse_hr,
+}
 
 
 def _parse_inline_tokens(inline_token: Token) -> list[AnyInline]:
@@ -194,60 +248,114 @@ def _parse_inline_tokens(inline_token: Token) -> list[AnyInline]:
         return []
 
     inlines: list[AnyInline] = []
-    i = 0
+    # Text and line breaks are buffered so each run becomes a single Text node
+    pending: list[str] = []
     tokens = inline_token.children
+    # Hoisted out of the loop, which runs once per inline token
+    add_text = pending.append
+    add_inline = inlines.append
+    get_handler = _INLINE_HANDLERS.get
+    n = len(tokens)
+    i = 0
 
-    while i < len(tokens):
+    while i < n:
         token = tokens[i]
+        token_type = token.type
+        if token_type == "text":
+            add_text(token.content)
+            i += 1
+            continue
+        if token_type == "softbreak" or token_type == "hardbreak":
+            add_text("\n")
+            i += 1
+            continue
+        handler = get_handler(token_type)
+        if handler is None:
+            # Unknown inline token - skip
+            i += 1
+            continue
+        if pending:
+            add_inline(make_text("".join(pending)))
+            pending.clear()
+        node, consumed = handler(tokens, i)
+        add_inline(node)
+        i += consumed
 
-        if token.type == "text":
-            inlines.append(Text(content=token.content))
-        elif token.type == "code_inline":
-            inlines.append(Code(content=token.content))
-        elif token.type == "strong_open":
-            # Find children until strong_close
-            children, consumed = _parse_styled_inline(tokens, i, "strong_open", "strong_close")
-            inlines.append(Bold(children=children))
-            i += consumed - 1  # -1 because loop will increment
-        elif token.type == "em_open":
-            children, consumed = _parse_styled_inline(tokens, i, "em_open", "em_close")
-            inlines.append(Italic(children=children))
-            i += consumed - 1
-        elif token.type == "s_open":
-            children, consumed = _parse_styled_inline(tokens, i, "s_open", "s_close")
-            inlines.append(Strikethrough(children=children))
-            i += consumed - 1
-        elif token.type == "link_open":
-            link, consumed = _parse_link(tokens, i)
-            inlines.append(link)
-            i += consumed - 1
-        elif token.type == "softbreak":
-            inlines.append(Text(content="\n"))
-        elif token.type == "hardbreak":
-            inlines.append(Text(content="\n"))
+    if pending:
+        inlines.append(make_text("".join(pending)))
+    return inlines
 
-        i += 1
 
-    return inlines
+def _parse_code_inline(tokens: list[Token], start_idx: int) -> tuple[AnyInline, int]:
+    """Parse an inline code token."""
+    return Code(content=tokens[start_idx].content), 1
+
+
+def _parse_bold(tokens: list[Token], start_idx: int) -> tuple[AnyInline, int]:
+    """Parse strong_open ... strong_close."""
+    children, consumed = _parse_styled_inline(tokens, start_idx)
+    return Bold(children=children), consumed
+
+
+def _parse_italic(tokens: list[Token], start_idx: int) -> tuple[AnyInline, int]:
+    """Parse em_open ... em_close."""
+    children, consumed = _parse_styled_inline(tokens, start_idx)
+    return Italic(children=children), consumed
+
+
+def _parse_strikethrough(tokens: list[Token], start_idx: int) -> tuple[AnyInline, int]:
+    """Parse s_open ... s_close."""
+    children, consumed = _parse_styled_inline(tokens, start_idx)
+    return Strikethrough(children=children), consumed
 
 
-def _parse_styled_inline(
-    tokens: list[Token], start_idx: int, open_type: str, close_type: str
-) -> tuple[list[AnyInline], int]:
+def _parse_styled_inline(tokens: list[Token], start_idx: int) -> tuple[list[AnyInline], int]:
     """Parse styled inline content (bold, italic, strikethrough)."""
-    children: list[AnyInline] = []
-    i = start_idx + 1
+    children, _, i = _collect_text_and_code(tokens, start_idx)
+    consumed = i - start_idx + 1  # Including close token
+    return children, consumed
+
 
-    while i < len(tokens) and tokens[i].type != close_type:
+def _collect_text_and_code(
+    tokens: list[Token], open_idx: int
+) -> tuple[list[AnyInline], list[str], int]:
+    """Collect the text and inline code inside the span opened at open_idx.
+
+    The matching close token is found by tracking markdown-it's nesting
+    levels during the same scan, so a nested span of the same type (e.g.
+    strong inside em inside strong) doesn't end the outer one early.
+
+    Returns the children, with each run of text merged into one Text node,
+    every text fragment in order (code excluded), and the index of the
+    closing token.
+    """
+    children: list[AnyInline] = []
+    texts: list[str] = []
+    run_start = 0
+    depth = 1
+    n = len(tokens)
+    i = open_idx + 1
+    while i < n:
         token = tokens[i]
-        if token.type == "text":
-            children.append(Text(content=token.content))
-        elif token.type == "code_inline":
+        nesting = token.nesting
+        if nesting:
+            depth += nesting
+            if not depth:
+                break
+            i += 1
+            continue
+        token_type = token.type
+        if token_type == "text":
+            texts.append(token.content)
+        elif token_type == "code_inline":
+            if len(texts) > run_start:
+                children.append(make_text("".join(texts[run_start:])))
+                run_start = len(texts)
             children.append(Code(content=token.content))
         i += 1
-
-    consumed = i - start_idx + 1  # Including close token
-    return children, consumed
+    if len(texts) > run_start:
+        children.append(make_text("".join(texts[run_start:] if run_start else texts)))
+    return children, texts, i
 
 
 def _parse_link(tokens: list[Token], start_idx: int) -> tuple[AnyInline, int]:
@@ -255,26 +363,20 @@ def _parse_link(tokens: list[Token], start_idx: int) -> tuple[AnyInline, int]:
 
     Recognizes slack:// URLs and converts them to appropriate AST nodes.
     """
-    link_open = tokens[start_idx]
-    url_attr = link_open.attrGet("href")
-    url = str(url_attr) if url_attr is not None else ""
+    url_attr = tokens[start_idx].attrGet("href")
+    # markdown-it stores href as a str, so the conversion is only a fallback
+    if isinstance(url_attr, str):
+        url = url_attr
+    else:
+        url = "" if url_attr is None else str(url_attr)
 
     # Parse link text
-    children: list[AnyInline] = []
-    i = start_idx + 1
-    while i < len(tokens) and tokens[i].type != "link_close":
-        token = tokens[i]
-        if token.type == "text":
-            children.append(Text(content=token.content))
-        elif token.type == "code_inline":
-            children.append(Code(content=token.content))
-        i += 1
-
+    children, texts, i = _collect_text_and_code(tokens, start_idx)
     consumed = i - start_idx + 1
 
     # Check if this is a slack:// URL
-    if isinstance(url, str) and url.startswith("slack://"):
-        slack_node = _parse_slack_url(url, children)
+    if url.startswith("slack://"):
+        slack_node = _parse_slack_url(url, texts)
         if slack_node:
             return slack_node, consumed
 
@@ -282,49 +384,121 @@ def _parse_link(tokens: list[Token], start_idx: int) -> tuple[AnyInline, int]:
     return Link(url=url, children=children), consumed
 
 
-def _parse_slack_url(url: str, children: list[AnyInline]) -> AnyInline | None:
-    """Parse a slack:// URL into a Slack-specific AST node."""
-    parsed = urlparse(url)
-    path = parsed.netloc  # In slack://user?id=U123, netloc is "user"
-    params = parse_qs(parsed.query)
-
-    if path == "user":
-        user_id = params.get("id", [""])[0]
-        username = params.get("name", [None])[0]
-        return UserMention(user_id=user_id, username=username)
-    elif path == "channel":
-        channel_id = params.get("id", [""])[0]
-        channel_name = params.get("name", [None])[0]
-        return ChannelMention(channel_id=channel_id, channel_name=channel_name)
-    elif path == "usergroup":
-        usergroup_id = params.get("id", [""])[0]
-        usergroup_name = params.get("name", [None])[0]
-        return UsergroupMention(usergroup_id=usergroup_id, usergroup_name=usergroup_name)
-    elif path == "broadcast":
-        broadcast_type = params.get("type", ["here"])[0]
-        return Broadcast(range=broadcast_type)
-    elif path == "date":
-        timestamp = int(params.get("ts", ["0"])[0])
-        date_format = params.get("format", [None])[0]
-        # Extract fallback from children text
-        fallback = "".join(child.content for child in children if isinstance(child, Text))
-        return DateTimestamp(timestamp=timestamp, format=date_format, fallback=fallback or None)
-
-    return None
-
-
-def _find_closing_token(
-    tokens: list[Token], start_idx: int, open_type: str, close_type: str
-) -> int:
-    """Find the index of the matching closing token."""
-    depth = 1
-    i = start_idx + 1
+# Inline token type -> handler returning (inline_node, tokens_consumed)
+_INLINE_HANDLERS: dict[str, Callable[[list[Token], int], tuple[AnyInline, int]]] = {
+    "code_inline": _parse_code_inline,
+    "strong_open": _parse_bold,
+    "em_open": _parse_italic,
+    "s_open": _parse_strikethrough,
+    "link_open": _parse_link,
+}
 
-    while i < len(tokens) and depth > 0:
-        if tokens[i].type == open_type:
-            depth += 1
-        elif tokens[i].type == close_type:
-            depth -= 1
-        i += 1
 
-    return i - 1  # Index of closing token
+def _parse_slack_url(url: str, texts: list[str]) -> AnyInline | None:
+    """Parse a slack:// URL into a Slack-specific AST node.
+
+    texts holds the link's text fragments, used as a date's fallback.
+    """
+    parts = _split_slack_url(url)
+    if parts is None:
+        return None
+    path, value, extra = parts
+    return _SLACK_BUILDERS[path](value, extra, texts)
+
+
+def _build_user(user_id: str, username: str | None, texts: list[str]) -> AnyInline:
+    """Build a UserMention and record its ID."""
+    record_user(user_id)
+    return UserMention(user_id=user_id, username=username)
+
+
+def _build_channel(channel_id: str, channel_name: str | None, texts: list[str]) -> AnyInline:
+    """Build a ChannelMention and record its ID."""
+    record_channel(channel_id)
+    return ChannelMention(channel_id=channel_id, channel_name=channel_name)
+
+
+def _build_usergroup(usergroup_id: str, usergroup_name: str | None, texts: list[str]) -> AnyInline:
+    """Build a UsergroupMention and record its ID."""
+    record_usergroup(usergroup_id)
+    return UsergroupMention(usergroup_id=usergroup_id, usergroup_name=usergroup_name)
+
+
+def _build_broadcast(broadcast_type: str, extra: str | None, texts: list[str]) -> AnyInline:
+    """Build a Broadcast node."""
+    return make_broadcast(broadcast_type)
+
+
+def _build_date(ts: str, date_format: str | None, texts: list[str]) -> AnyInline:
+    """Build a DateTimestamp, using the link text as its fallback."""
+    return DateTimestamp(timestamp=int(ts), format=date_format, fallback="".join(texts) or None)
+
+
+# slack:// path -> builder taking (main value, secondary value, link text fragments)
+_SLACK_BUILDERS: dict[str, Callable[[str, str | None, list[str]], AnyInline]] = {
+    "user": _build_user,
+    "channel": _build_channel,
+    "usergroup": _build_usergroup,
+    "broadcast": _build_broadcast,
+    "date": _build_date,
+}
+
+
+# slack:// path -> (main query key, its default, optional secondary key)
+_SLACK_URL_KEYS: dict[str, tuple[str, str, str | None]] = {
+    "user": ("id", "", "name"),
+    "channel": ("id", "", "name"),
+    "usergroup": ("id", "", "name"),
+    "broadcast": ("type", "here", None),
+    "date": ("ts", "0", "format"),
+}
+
+
+@lru_cache(maxsize=1024)
+def _split_slack_url(url: str) -> tuple[str, str, str | None] | None:
+    """Split a slack:// URL into (path, main value, secondary value).
+
+    Cached because the same mentions tend to repeat across messages. Returns
+    None for paths that aren't Slack entities, without parsing the query.
+    """
+    # In slack://user?id=U123 the path is the URL's netloc, "user"
+    rest = url[len("slack://") :].partition("#")[0]
+    netloc, _, query = rest.partition("?")
+    path = netloc.partition("/")[0]
+    keys = _SLACK_URL_KEYS.get(path)
+    if keys is None:
+        return None
+    main_key, default, extra_key = keys
+
+    # Only the one or two known keys are wanted, so scan the query by hand
+    # rather than building parse_qs's dict of lists. Same rules as parse_qs:
+    # the first non-empty value wins, and "+" means a space.
+    params: dict[str, str] = {}
+    for pair in query.split("&"):
+        key, _, value = pair.partition("=")
+        if value and (key == main_key or key == extra_key) and key not in params:
+            if "+" in value:
+                value = value.replace("+", " ")
+            if "%" in value:
+                value = unquote(value)
+            params[key] = value
+    extra = params.get(extra_key) if extra_key else None
+    return path, params.get(main_key, default), extra
+
+
+def _build_close_map(tokens: list[Token]) -> dict[int, int]:
+    """Map the index of every opening block token to its closing token's index.
+
+    One linear pass, so nested blocks don't each rescan the tokens that follow.
+    """
+    close_map: dict[int, int] = {}
+    open_stack: list[int] = []
+    for i, token in enumerate(tokens):
+        if token.nesting == 1:
+            open_stack.append(i)
+        elif token.nesting == -1 and open_stack:
+            close_map[open_stack.pop()] = i
+    # Unbalanced openers close at the end of the stream
+    for i in open_stack:
+        close_map[i] = len(tokens) - 1
+    return close_map
@@ -3,15 +3,17 @@
 Converts Slack mrkdwn string to AST using a state machine tokenizer.
 """
 
+import re
+from bisect import bisect_left
 from dataclasses import dataclass
 from enum import Enum, auto
+from functools import lru_cache
 
 from ..ast import (
     AnyBlock,
     AnyInline,
     BlockNode,
     Bold,
-    Broadcast,
     ChannelMention,
     Code,
     CodeBlock,
@@ -24,9 +26,12 @@ from ..ast import (
     Paragraph,
     Quote,
     Strikethrough,
-    Text,
     UserMention,
+    make_broadcast,
+    make_text,
 )
+from ..ast.nodes import _copy_tree
+from ._stats import ParseStats, collect_stats, merge_stats, record_channel, record_user
 
 
 class State(Enum):
@@ -36,7 +41,7 @@ class State(Enum):
     IN_CODE_BLOCK = auto()
 
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     """Token produced by tokenizer."""
 
@@ -53,6 +58,8 @@ class MrkdwnTokenizer:
     - IN_CODE_BLOCK: Treat everything as literal text except closing ```
     """
 
+    __slots__ = ("text", "pos", "length", "state", "tokens")
+
     def __init__(self, text: str):
         self.text = text
         self.pos = 0
@@ -62,18 +69,20 @@ class MrkdwnTokenizer:
 
     def tokenize(self) -> list[Token]:
         """Tokenize input into list of tokens."""
-        while self.pos < self.length:
-            if self.state == State.OUTSIDE_CODE_BLOCK:
-                self._tokenize_outside()
-            elif self.state == State.IN_CODE_BLOCK:
-                self._tokenize_inside()
+        # Bind what the loop reads on every step to locals
+        length = self.length
+        outside = State.OUTSIDE_CODE_BLOCK
+        tokenize_outside = self._tokenize_outside
+        tokenize_inside = self._tokenize_inside
+        self._tokenize_line_start()
+        while self.pos < length:
+            if self.state is outside:
+                tokenize_outside()
+            else:
+                tokenize_inside()
 
         return self.tokens
 
-    def _peek(self, n: int = 1) -> str:
-        """Peek ahead n characters without advancing position."""
-        return self.text[self.pos : self.pos + n]
-
     def _advance(self, n: int = 1) -> None:
         """Advance position by n characters."""
         self.pos += n
@@ -96,88 +105,68 @@ class MrkdwnTokenizer:
         - 1., 2., etc. at line start → parse as ordered list marker
         - \n → parse as newline
         """
-        at_line_start = self.pos == 0 or self.text[self.pos - 1] == "\n"
-
-        # Check for code block start (```)
-        if self._peek(3) == "```":
-            self.tokens.append(Token("code_block_start", "```", self.pos))
-            self._advance(3)
-            self.state = State.IN_CODE_BLOCK
+        # One search finds the next marker and classifies it by group name;
+        # everything before it is plain text
+        text = self.text
+        pos = self.pos
+        match = _OUTSIDE_TOKEN_RE.search(text, pos)
+        if match is None:
+            self.tokens.append(Token("text", text[pos:], pos))
+            self.pos = self.length
             return
 
-        # Check for inline code (`text`)
-        if self._peek() == "`":
-            self._parse_inline_code()
-            return
-
-        # Check for angle bracket content (<...>)
-        if self._peek() == "<":
+        start = match.start()
+        if start > pos:
+            # Note: > is not special here, since Slack mrkdwn uses &gt; which
+            # is only a marker at line start. Plain > is treated as regular text.
+            self.tokens.append(Token("text", text[pos:start], pos))
+            self.pos = start
+
+        kind = match.lastgroup
+        if kind == "newline":
+            self.tokens.append(Token("newline", "\n", start))
+            self.pos = start + 1
+            self._tokenize_line_start()
+        elif kind == "bold":
+            self.tokens.append(Token("bold_marker", "*", start))
+            self.pos = start + 1
+        elif kind == "italic":
+            self.tokens.append(Token("italic_marker", "_", start))
+            self.pos = start + 1
+        elif kind == "code":
+            # Check for code block start (```)
+            if text.startswith("```", start):
+                self.tokens.append(Token("code_block_start", "```", start))
+                self.pos = start + 3
+                self.state = State.IN_CODE_BLOCK
+            else:
+                self._parse_inline_code()
+        elif kind == "strike":
+            self.tokens.append(Token("strike_marker", "~", start))
+            self.pos = start + 1
+        else:
             self._parse_angle_bracket()
-            return
 
-        # Check for bold marker (*)
-        if self._peek() == "*":
-            self.tokens.append(Token("bold_marker", "*", self.pos))
-            self._advance()
-            return
+    def _tokenize_line_start(self) -> None:
+        """Tokenize a quote or list marker, if one starts the current line.
 
-        # Check for italic marker (_)
-        if self._peek() == "_":
-            self.tokens.append(Token("italic_marker", "_", self.pos))
-            self._advance()
-            return
-
-        # Check for strikethrough marker (~)
-        if self._peek() == "~":
-            self.tokens.append(Token("strike_marker", "~", self.pos))
-            self._advance()
+        Called at the start of input and after each newline outside code
+        blocks, the only places these markers are recognized.
+        """
+        match = _LINE_START_RE.match(self.text, self.pos)
+        if match is None:
             return
 
-        # Check for quote marker (&gt; at line start)
-        if at_line_start and self._peek(4) == "&gt;":
+        # The optional space after a marker is part of the match
+        kind = match.lastgroup
+        if kind == "quote":
             self.tokens.append(Token("quote_marker", "&gt;", self.pos))
-            self._advance(4)
-            # Skip optional space after &gt;
-            if self._peek() == " ":
-                self._advance()
-            return
-
-        # Check for bullet list marker (• at line start)
-        if at_line_start and self._peek() == "•":
+        elif kind == "bullet":
             self.tokens.append(Token("bullet_marker", "•", self.pos))
-            self._advance()
-            # Skip optional space after bullet
-            if self._peek() == " ":
-                self._advance()
-            return
-
-        # Check for ordered list marker (1., 2., etc. at line start)
-        if at_line_start and self._peek().isdigit():
-            num_start = self.pos
-            # Collect digits
-            while self._peek().isdigit():
-                self._advance()
-            # Check for period and space
-            if self._peek() == ".":
-                num_text = self.text[num_start : self.pos]
-                self.tokens.append(Token("ordered_marker", num_text, num_start))
-                self._advance()  # Skip period
-                # Skip optional space after period
-                if self._peek() == " ":
-                    self._advance()
-                return
-            else:
-                # Not a list marker, backtrack
-                self.pos = num_start
-
-        # Check for newline
-        if self._peek() == "\n":
-            self.tokens.append(Token("newline", "\n", self.pos))
-            self._advance()
-            return
-
-        # Regular text - accumulate until next special character
-        self._parse_text_outside()
+        else:
+            # Ordered list number; its period is skipped
+            self.tokens.append(Token("ordered_marker", match.group("ordered"), self.pos))
+        self.pos = match.end()
 
     def _tokenize_inside(self) -> None:
         """Tokenize when inside code blocks.
@@ -188,21 +177,13 @@ class MrkdwnTokenizer:
         - Everything else → literal text (no formatting)
         """
         # Check for code block end (```)
-        if self._peek(3) == "```":
+        if self.text.startswith("```", self.pos):
             self.tokens.append(Token("code_block_end", "```", self.pos))
             self._advance(3)
             self.state = State.OUTSIDE_CODE_BLOCK
             return
 
-        # Check for angle bracket URL and strip
-        if self._peek() == "<":
-            url = self._try_extract_url()
-            if url:
-                # Strip angle brackets from URLs in code blocks
-                self.tokens.append(Token("text", url, self.pos))
-                return
-
-        # Everything else is literal text
+        # Literal text, and any <url> it runs into
         self._parse_text_inside()
 
     def _parse_inline_code(self) -> None:
@@ -241,7 +222,7 @@ class MrkdwnTokenizer:
         content = self.text[self.pos + 1 : end]
 
         # Check for URL (http:// or https://)
-        if content.startswith("http://") or content.startswith("https://"):
+        if content.startswith(("http://", "https://")):
             self.tokens.append(Token("link", content, start_pos))
             self.pos = end + 1
             return
@@ -268,79 +249,48 @@ class MrkdwnTokenizer:
         self.tokens.append(Token("text", self.text[start_pos : end + 1], start_pos))
         self.pos = end + 1
 
-    def _try_extract_url(self) -> str | None:
-        """Try to extract URL from <url> if present.
-
-        Returns URL without brackets, or None if not a URL.
-        """
-        end = self.text.find(">", self.pos)
-        if end == -1:
-            return None
-
-        content = self.text[self.pos + 1 : end]
-
-        # Check if it looks like a URL
-        if content.startswith("http://") or content.startswith("https://"):
-            self.pos = end + 1
-            return content  # Return URL without brackets
-
-        return None
-
-    def _parse_text_outside(self) -> None:
-        """Parse regular text when outside code blocks.
-
-        Accumulate characters until next special character.
-        """
-        start_pos = self.pos
-        text_chars = []
-
-        while self.pos < self.length:
-            char = self._peek()
-
-            # Stop at special characters
-            if char in ("*", "_", "~", "`", "<", "\n"):
-                break
-
-            # Stop at ``` (code block start)
-            if self._peek(3) == "```":
-                break
-
-            # Note: We don't check for > here anymore, since Slack mrkdwn uses &gt;
-            # which is checked in the main tokenizer. Plain > is treated as regular text.
-
-            text_chars.append(char)
-            self._advance()
-
-        if text_chars:
-            self.tokens.append(Token("text", "".join(text_chars), start_pos))
-
     def _parse_text_inside(self) -> None:
         """Parse literal text when inside code blocks.
 
-        Accumulate characters until ``` or <url>.
+        Consume characters up to ``` or a <url>, and emit the URL with its
+        angle brackets stripped using the > found while checking it closes.
         """
         start_pos = self.pos
-        text_chars = []
-
-        while self.pos < self.length:
-            # Stop at code block end
-            if self._peek(3) == "```":
-                break
-
-            # Stop at potential URL
-            if self._peek() == "<":
-                # Check if this is a URL that should be stripped
-                end = self.text.find(">", self.pos)
-                if end != -1:
-                    content = self.text[self.pos + 1 : end]
-                    if content.startswith("http://") or content.startswith("https://"):
-                        break
-
-            text_chars.append(self._peek())
-            self._advance()
-
-        if text_chars:
-            self.tokens.append(Token("text", "".join(text_chars), start_pos))
+        text = self.text
+        match = _INSIDE_SPECIAL_RE.search(text, start_pos)
+        end = self.length
+        url_end = -1
+        if match is not None:
+            end = match.start()
+            if match.group() != "```":
+                url_end = text.find(">", end)
+                if url_end == -1:
+                    # Nothing after this point closes a <url>, so only the
+                    # closing fence can end the text
+                    fence = text.find("```", end)
+                    end = self.length if fence == -1 else fence
+
+        if end > start_pos:
+            self.tokens.append(Token("text", text[start_pos:end], start_pos))
+            self.pos = end
+
+        if url_end != -1:
+            self.pos = url_end + 1
+            self.tokens.append(Token("text", text[end + 1 : url_end], self.pos))
+
+
+# Characters that end a run of plain text outside code blocks (``` starts
+# with `). The lookbehind names the character that matched without slowing
+# the scan, which stays a plain character-class search.
+_OUTSIDE_TOKEN_RE = re.compile(
+    r"[\n*_`~<](?<="
+    r"(?P<newline>\n)|(?P<bold>\*)|(?P<italic>_)|(?P<code>`)|(?P<strike>~)|(?P<angle><)"
+    r")"
+)
+# Markers recognized only at the start of a line
+_LINE_START_RE = re.compile(r"(?P<quote>&gt;) ?|(?P<bullet>•) ?|(?P<ordered>\d+)\. ?")
+# What ends literal text inside a code block: its closing fence, or a URL
+_INSIDE_SPECIAL_RE = re.compile(r"```|<(?=https?://)")
 
 
 # Parser: Build AST from tokens
@@ -361,41 +311,88 @@ def parse_mrkdwn(mrkdwn_text: str) -> Document:
         >>> mrkdwn = "*Hello* _world_"
         >>> doc = parse_mrkdwn(mrkdwn)
     """
-    tokenizer = MrkdwnTokenizer(mrkdwn_text)
-    tokens = tokenizer.tokenize()
-    return _parse_tokens_to_ast(tokens)
+    doc, stats = _parse_mrkdwn_with_stats(mrkdwn_text)
+    merge_stats(stats)
+    if len(mrkdwn_text) <= _CACHE_MAX_LEN:
+        # Cached trees are shared with later calls; hand out lists of its own
+        return _copy_tree(doc)
+    return doc
+
+
+# Longer inputs are parsed every time rather than kept alive as cache keys
+_CACHE_MAX_LEN = 4096
+
+
+def _parse_mrkdwn_with_stats(mrkdwn_text: str) -> tuple[Document, ParseStats]:
+    """Parse mrkdwn to AST, also returning the mention IDs it references.
+
+    Results for short inputs are cached, so the returned Document may be
+    shared with other callers. Its children lists must not be modified (copy
+    it with _copy_tree first), and neither must the stats.
+    """
+    if _is_plain_text(mrkdwn_text):
+        return Document(children=[Paragraph(children=[make_text(mrkdwn_text)])]), ParseStats()
+    if len(mrkdwn_text) <= _CACHE_MAX_LEN:
+        return _parse_mrkdwn_cached(mrkdwn_text)
+    return _parse_mrkdwn_uncached(mrkdwn_text)
+
+
+def _is_plain_text(mrkdwn_text: str) -> bool:
+    """Check whether text would parse to a single paragraph of itself.
+
+    Most chat messages are a single line with no formatting; for those,
+    tokenizing only to get the text back is wasted work.
+    """
+    return (
+        bool(mrkdwn_text)
+        and _OUTSIDE_TOKEN_RE.search(mrkdwn_text) is None
+        and _LINE_START_RE.match(mrkdwn_text) is None
+    )
+
+
+def _parse_mrkdwn_uncached(mrkdwn_text: str) -> tuple[Document, ParseStats]:
+    """Parse mrkdwn to AST and stats, bypassing the cache."""
+    with collect_stats() as stats:
+        tokens = MrkdwnTokenizer(mrkdwn_text).tokenize()
+        return _parse_tokens_to_ast(tokens), stats
+
+
+_parse_mrkdwn_cached = lru_cache(maxsize=1024)(_parse_mrkdwn_uncached)
 
 
 def _parse_tokens_to_ast(tokens: list[Token]) -> Document:
     """Build AST from tokens."""
 
     blocks: list[AnyBlock] = []
+    n = len(tokens)
     i = 0
 
-    while i < len(tokens):
+    while i < n:
+        token_type = tokens[i].type
+
         # Check for code block
-        if tokens[i].type == "code_block_start":
+        if token_type == "code_block_start":
             block, consumed = _parse_code_block_tokens(tokens, i)
             blocks.append(block)
             i += consumed
             continue
 
         # Check for quote
-        if tokens[i].type == "quote_marker":
+        if token_type == "quote_marker":
             quote_block, consumed = _parse_quote_tokens(tokens, i)
             blocks.append(quote_block)
             i += consumed
             continue
 
         # Check for bullet list
-        if tokens[i].type == "bullet_marker":
+        if token_type == "bullet_marker":
             list_block, consumed = _parse_list_tokens(tokens, i, ordered=False)
             blocks.append(list_block)
             i += consumed
             continue
 
         # Check for ordered list
-        if tokens[i].type == "ordered_marker":
+        if token_type == "ordered_marker":
             list_block, consumed = _parse_list_tokens(tokens, i, ordered=True)
             blocks.append(list_block)
             i += consumed
@@ -420,32 +417,21 @@ def _parse_code_block_tokens(tokens: list[Token], start: int) -> tuple[CodeBlock
     """
     assert tokens[start].type == "code_block_start"
     i = start + 1
-
-    # Collect content tokens until code_block_end
-    content_parts = []
-    language = None
-    found_end = False
-
-    while i < len(tokens):
-        if tokens[i].type == "code_block_end":
-            found_end = True
-            break
-
-        if tokens[i].type == "text":
-            content_parts.append(tokens[i].content)
-        elif tokens[i].type == "newline":
-            content_parts.append("\n")
-
+    while i < len(tokens) and tokens[i].type != "code_block_end":
         i += 1
+    found_end = i < len(tokens)
+    language = None
 
-    # Join content
-    content = "".join(content_parts)
+    # Inside a code block the tokenizer only emits text, as a single slice of
+    # the input unless <url> brackets were stripped from it
+    body = tokens[start + 1 : i]
+    content = body[0].content if len(body) == 1 else "".join(token.content for token in body)
 
     # Check if first line is language identifier (no spaces, alphanumeric)
-    lines = content.split("\n", 1)
-    if len(lines) >= 2 and lines[0] and lines[0].isalnum():
-        language = lines[0]
-        content = lines[1] if len(lines) > 1 else ""
+    first_line, newline, rest = content.partition("\n")
+    if newline and first_line.isalnum():
+        language = first_line
+        content = rest
 
     # Preserve trailing newlines for mrkdwn round-trip consistency
     # (GFM parser strips them, but mrkdwn parser preserves structure)
@@ -459,38 +445,35 @@ def _parse_quote_tokens(tokens: list[Token], start: int) -> tuple[Quote, int]:
     assert tokens[start].type == "quote_marker"
     i = start + 1
 
-    # Collect tokens until double newline or different block type
-    inline_tokens = []
-    while i < len(tokens):
-        if tokens[i].type == "quote_marker":
-            # Another quote line - skip the marker
-            i += 1
-            continue
-
-        if tokens[i].type == "newline":
+    # Find the end of the quote: a double newline or different block type.
+    # Later quote markers inside it are skipped by the inline parser.
+    n = len(tokens)
+    end = n
+    while i < n:
+        token_type = tokens[i].type
+        if token_type == "newline" and i + 1 < n:
+            next_type = tokens[i + 1].type
             # Check for double newline (end of quote)
-            if i + 1 < len(tokens) and tokens[i + 1].type == "newline":
+            if next_type == "newline":
+                end = i
                 i += 2
                 break
             # Check if next line has quote marker - if not, end quote
-            if i + 1 < len(tokens) and tokens[i + 1].type != "quote_marker":
+            if next_type != "quote_marker":
+                end = i
                 i += 1
                 break
-            # Single newline within quote - preserve it as literal newline
-            # The GFM visitor will add > prefix to each line
-            inline_tokens.append(Token("text", "\n", tokens[i].pos))
-            i += 1
-            continue
 
-        if tokens[i].type == "code_block_start":
+        elif token_type == "code_block_start":
             # Different block type - end quote
+            end = i
             break
 
-        inline_tokens.append(tokens[i])
         i += 1
 
-    # Parse inline content
-    inlines = _parse_inline_tokens(inline_tokens)
+    # Parse inline content. Single newlines within the quote are preserved
+    # as literal newlines; the GFM visitor will add > prefix to each line.
+    inlines = _parse_inline_tokens(tokens, start + 1, end, newline="\n")
     para = Paragraph(children=inlines)
     consumed = i - start
     return Quote(children=[para]), consumed
@@ -514,7 +497,8 @@ def _parse_list_tokens(tokens: list[Token], start: int, ordered: bool) -> tuple[
     if ordered and tokens[i].type == "ordered_marker":
         start_num = int(tokens[i].content)
 
-    while i < len(tokens):
+    n = len(tokens)
+    while i < n:
         # Check if this is a list marker
         if tokens[i].type != marker_type:
             break
@@ -522,20 +506,19 @@ def _parse_list_tokens(tokens: list[Token], start: int, ordered: bool) -> tuple[
         # Skip the marker
         i += 1
 
-        # Collect tokens for this list item until newline
-        item_tokens = []
-        while i < len(tokens):
-            if tokens[i].type == "newline":
-                i += 1
-                break
-            item_tokens.append(tokens[i])
+        # Find the end of this list item: the next newline
+        item_start = i
+        while i < n and tokens[i].type != "newline":
+            i += 1
+        item_end = i
+        if i < n:
             i += 1
 
         # Parse item content
-        if item_tokens:
+        if item_end > item_start:
             from typing import cast
 
-            inlines = _parse_inline_tokens(item_tokens)
+            inlines = _parse_inline_tokens(tokens, item_start, item_end)
             # Cast to the expected type - AnyInline items are also InlineNode
             list_items.append(ListItem(children=cast(list[InlineNode | BlockNode], inlines)))
 
@@ -545,154 +528,204 @@ def _parse_list_tokens(tokens: list[Token], start: int, ordered: bool) -> tuple[
 
 def _parse_paragraph_tokens(tokens: list[Token], start: int) -> tuple[Paragraph | None, int]:
     """Parse paragraph from tokens."""
-    # Collect tokens until double newline or block marker
-    inline_tokens = []
+    # Find the end of the paragraph: a double newline or block marker
+    n = len(tokens)
     i = start
+    end = n
 
-    while i < len(tokens):
-        if tokens[i].type in (
-            "code_block_start",
-            "quote_marker",
-            "bullet_marker",
-            "ordered_marker",
-        ):
+    while i < n:
+        token_type = tokens[i].type
+        if token_type in _BLOCK_START_TOKENS:
             # Different block type
+            end = i
             break
 
-        if tokens[i].type == "newline":
-            # Check for double newline (end of paragraph)
-            if i + 1 < len(tokens) and tokens[i + 1].type == "newline":
-                i += 2
-                break
+        if token_type == "newline":
             # Check if this is the last token (trailing newline)
-            if i + 1 >= len(tokens):
+            if i + 1 >= n:
+                end = i
                 i += 1
                 break
+            next_type = tokens[i + 1].type
+            # Check for double newline (end of paragraph)
+            if next_type == "newline":
+                end = i
+                i += 2
+                break
             # Check if next token is a block boundary (list, quote, code block)
-            if i + 1 < len(tokens) and tokens[i + 1].type in (
-                "bullet_marker",
-                "ordered_marker",
-                "quote_marker",
-                "code_block_start",
-            ):
+            if next_type in _BLOCK_START_TOKENS:
+                end = i
                 i += 1
                 break
-            # Single newline - convert to space
-            inline_tokens.append(Token("text", " ", tokens[i].pos))
-            i += 1
-            continue
 
-        inline_tokens.append(tokens[i])
         i += 1
 
-    if not inline_tokens:
+    if end == start:
         return None, i - start
 
-    inlines = _parse_inline_tokens(inline_tokens)
+    # Single newlines within the paragraph are converted to spaces
+    inlines = _parse_inline_tokens(tokens, start, end, newline=" ")
     consumed = i - start
     return Paragraph(children=inlines), consumed
 
 
-def _parse_inline_tokens(tokens: list[Token]) -> list[AnyInline]:
-    """Parse inline tokens into AST nodes."""
+# Token types that start a block other than a paragraph
+_BLOCK_START_TOKENS = frozenset(
+    {"code_block_start", "quote_marker", "bullet_marker", "ordered_marker"}
+)
+
+
+def _parse_inline_tokens(
+    tokens: list[Token],
+    start: int,
+    end: int,
+    newline: str = " ",
+) -> list[AnyInline]:
+    """Parse inline tokens into AST nodes.
+
+    Only ``tokens[start:end]`` is parsed, and newline tokens in that range
+    become ``newline`` text. Blocks pass their bounds in the shared token list
+    instead of copying their tokens out. Formatting spans are kept on an
+    explicit stack rather than parsed recursively.
+    """
+    if end - start == 1 and tokens[start].type == "text":
+        # A line of plain text needs no marker index or span handling
+        content = tokens[start].content
+        return [make_text(content)] if content else []
+
+    markers = _index_markers(tokens, start, end)
     inlines: list[AnyInline] = []
-    i = 0
+    # Text, newlines and unclosed markers are buffered so each run becomes a
+    # single Text node; the buffer is flushed before any other node is added
+    pending: list[str] = []
+    # Open spans: (node type, enclosing inlines, enclosing end)
+    stack: list[tuple[type[Bold | Italic | Strikethrough], list[AnyInline], int]] = []
+    i = start
+
+    while True:
+        if i >= end:
+            if pending:
+                inlines.append(make_text("".join(pending)))
+                pending.clear()
+            if not stack:
+                break
+            # Reached the closing marker of the innermost span
+            span_type, parent, parent_end = stack.pop()
+            parent.append(span_type(children=inlines))
+            inlines = parent
+            i = end + 1
+            end = parent_end
+            continue
 
-    while i < len(tokens):
         token = tokens[i]
 
         if token.type == "text":
             if token.content:  # Skip empty text
-                inlines.append(Text(content=token.content))
+                pending.append(token.content)
             i += 1
+            continue
 
-        elif token.type == "inline_code":
+        if token.type == "newline":
+            pending.append(newline)
+            i += 1
+            continue
+
+        if token.type in _SPAN_MARKERS:
+            span_type, literal = _SPAN_MARKERS[token.type]
+            # Find matching closing marker
+            closing = _find_closing_marker(markers[token.type], i + 1, end)
+            if closing == -1:
+                # No closing marker - treat as literal text
+                pending.append(literal)
+                i += 1
+                continue
+        elif token.type not in _INLINE_NODE_TOKENS:
+            # Unknown token type - skip
+            i += 1
+            continue
+
+        if pending:
+            inlines.append(make_text("".join(pending)))
+            pending.clear()
+
+        if token.type == "inline_code":
             inlines.append(Code(content=token.content))
             i += 1
 
         elif token.type == "link":
             # Parse link: url or url|text
-            if "|" in token.content:
-                url, link_text = token.content.split("|", 1)
-                inlines.append(Link(url=url, children=[Text(content=link_text)]))
+            url, sep, link_text = token.content.partition("|")
+            if sep:
+                inlines.append(Link(url=url, children=[make_text(link_text)]))
             else:
-                inlines.append(Link(url=token.content, children=[]))
+                inlines.append(Link(url=url, children=[]))
             i += 1
 
         elif token.type == "user_mention":
             # Parse user mention: USER_ID or USER_ID|name
-            if "|" in token.content:
-                user_id, username = token.content.split("|", 1)
+            user_id, sep, username = token.content.partition("|")
+            record_user(user_id)
+            if sep:
                 inlines.append(UserMention(user_id=user_id, username=username))
             else:
-                inlines.append(UserMention(user_id=token.content))
+                inlines.append(UserMention(user_id=user_id))
             i += 1
 
         elif token.type == "channel_mention":
             # Parse channel mention: CHANNEL_ID or CHANNEL_ID|name
-            if "|" in token.content:
-                channel_id, channel_name = token.content.split("|", 1)
+            channel_id, sep, channel_name = token.content.partition("|")
+            record_channel(channel_id)
+            if sep:
                 inlines.append(ChannelMention(channel_id=channel_id, channel_name=channel_name))
             else:
-                inlines.append(ChannelMention(channel_id=token.content))
+                inlines.append(ChannelMention(channel_id=channel_id))
             i += 1
 
         elif token.type == "broadcast":
             # Parse broadcast: here, channel, or everyone
-            inlines.append(Broadcast(range=token.content))
+            inlines.append(make_broadcast(token.content))
             i += 1
 
-        elif token.type == "bold_marker":
-            # Find matching closing marker
-            closing = _find_closing_marker(tokens, i + 1, "bold_marker")
-            if closing != -1:
-                # Parse content between markers
-                inner_tokens = tokens[i + 1 : closing]
-                inner_inlines = _parse_inline_tokens(inner_tokens)
-                inlines.append(Bold(children=inner_inlines))
-                i = closing + 1
-            else:
-                # No closing marker - treat as literal text
-                inlines.append(Text(content="*"))
-                i += 1
-
-        elif token.type == "italic_marker":
-            # Find matching closing marker
-            closing = _find_closing_marker(tokens, i + 1, "italic_marker")
-            if closing != -1:
-                inner_tokens = tokens[i + 1 : closing]
-                inner_inlines = _parse_inline_tokens(inner_tokens)
-                inlines.append(Italic(children=inner_inlines))
-                i = closing + 1
-            else:
-                inlines.append(Text(content="_"))
-                i += 1
-
-        elif token.type == "strike_marker":
-            # Find matching closing marker
-            closing = _find_closing_marker(tokens, i + 1, "strike_marker")
-            if closing != -1:
-                inner_tokens = tokens[i + 1 : closing]
-                inner_inlines = _parse_inline_tokens(inner_tokens)
-                inlines.append(Strikethrough(children=inner_inlines))
-                i = closing + 1
-            else:
-                inlines.append(Text(content="~"))
-                i += 1
-
         else:
-            # Unknown token type - skip
+            # Closing marker was found above; parse content between markers
+            # as a nested span
+            stack.append((span_type, inlines, end))
+            inlines = []
+            end = closing
             i += 1
 
     return inlines
 
 
-def _find_closing_marker(tokens: list[Token], start: int, marker_type: str) -> int:
-    """Find the index of the closing marker.
+def _index_markers(tokens: list[Token], start: int, end: int) -> dict[str, list[int]]:
+    """Map each formatting marker type to the sorted indices of its tokens."""
+    markers: dict[str, list[int]] = {marker_type: [] for marker_type in _SPAN_MARKERS}
+    for i in range(start, end):
+        positions = markers.get(tokens[i].type)
+        if positions is not None:
+            positions.append(i)
+    return markers
+
+
+def _find_closing_marker(positions: list[int], start: int, end: int) -> int:
+    """Find the index of the first marker in ``positions`` within ``[start, end)``.
 
     Returns -1 if not found.
     """
-    for i in range(start, len(tokens)):
-        if tokens[i].type == marker_type:
-            return i
+    idx = bisect_left(positions, start)
+    if idx < len(positions) and positions[idx] < end:
+        return positions[idx]
     return -1
+
+
+# Formatting marker token types, with the node each span becomes and the
+# literal text an unclosed marker falls back to
+_SPAN_MARKERS: dict[str, tuple[type[Bold | Italic | Strikethrough], str]] = {
+    "bold_marker": (Bold, "*"),
+    "italic_marker": (Italic, "_"),
+    "strike_marker": (Strikethrough, "~"),
+}
+# Token types that become an inline node other than Text
+_INLINE_NODE_TOKENS = frozenset(
+    {"inline_code", "link", "user_mention", "channel_mention", "broadcast", *_SPAN_MARKERS}
+)
@@ -3,7 +3,8 @@
 Converts Slack Rich Text JSON structure to AST.
 """
 
-from typing import Any, cast
+from collections.abc import Callable
+from typing import Any
 
 from ..ast import (
     AnyBlock,
@@ -27,7 +28,12 @@ from ..ast import (
     Text,
     UsergroupMention,
     UserMention,
+    coalesce_text,
+    make_broadcast,
+    make_emoji,
+    make_text,
 )
+from ._stats import ParseStats, collect_stats, record_channel, record_user, record_usergroup
 
 
 def parse_rich_text(rich_text_data: dict[str, Any] | list[dict[str, Any]]) -> Document:
@@ -64,41 +70,39 @@ def parse_rich_text(rich_text_data: dict[str, Any] | list[dict[str, Any]]) -> Do
     return Document(children=children)
 
 
+def _parse_rich_text_with_stats(
+    rich_text_data: dict[str, Any] | list[dict[str, Any]],
+) -> tuple[Document, ParseStats]:
+    """Parse Rich Text JSON to AST, also returning the mention IDs it references."""
+    with collect_stats() as stats:
+        return parse_rich_text(rich_text_data), stats
+
+
 def _parse_block_element(element: dict[str, Any]) -> AnyBlock:
     """Parse a block-level rich text element."""
-    elem_type = element.get("type", "")
-
-    if elem_type == "rich_text_section":
-        return _parse_section(element)
-    elif elem_type == "rich_text_list":
-        return _parse_list(element)
-    elif elem_type == "rich_text_preformatted":
-        return _parse_preformatted(element)
-    elif elem_type == "rich_text_quote":
-        return _parse_quote(element)
-    else:
+    parser = _BLOCK_PARSERS.get(element.get("type", ""))
+    if parser is None:
         # Unknown block type - treat as paragraph
         return Paragraph(children=[])
+    return parser(element)
 
 
 def _parse_section(section: dict[str, Any]) -> Paragraph:
     """Parse a rich_text_section into a Paragraph."""
-    from dataclasses import replace
-
     elements = section.get("elements", [])
-    children = [_parse_inline_element(elem) for elem in elements]
+    children = coalesce_text([_parse_inline_element(elem) for elem in elements])
 
     # Strip trailing newlines from last text element (block boundary)
-    if children and isinstance(children[-1], Text):
-        content = children[-1].content.rstrip("\n")
-        if content != children[-1].content:
-            children[-1] = replace(children[-1], content=content)
+    if children:
+        last = children[-1]
+        if isinstance(last, Text) and last.content.endswith("\n"):
+            children[-1] = make_text(last.content.rstrip("\n"))
 
     # Strip leading newlines from first text element (block boundary)
-    if children and isinstance(children[0], Text):
-        content = children[0].content.lstrip("\n")
-        if content != children[0].content:
-            children[0] = replace(children[0], content=content)
+    if children:
+        first = children[0]
+        if isinstance(first, Text) and first.content.startswith("\n"):
+            children[0] = make_text(first.content.lstrip("\n"))
 
     return Paragraph(children=children)
 
@@ -110,13 +114,13 @@ def _parse_list(list_elem: dict[str, Any]) -> List:
     elements = list_elem.get("elements", [])
 
     # Each element in a rich_text_list is a rich_text_section
-    items = []
-    for elem in elements:
-        if elem.get("type") == "rich_text_section":
-            inline_elements: list[AnyInline] = [
-                _parse_inline_element(e) for e in elem.get("elements", [])
-            ]
-            items.append(ListItem(children=inline_elements))  # type: ignore[arg-type]
+    items = [
+        ListItem(
+            children=coalesce_text([_parse_inline_element(e) for e in elem.get("elements", [])])
+        )
+        for elem in elements
+        if elem.get("type") == "rich_text_section"
+    ]
 
     return List(ordered=ordered, children=items)
 
@@ -129,182 +133,141 @@ def _parse_preformatted(preformatted: dict[str, Any]) -> CodeBlock:
     """
     elements = preformatted.get("elements", [])
     # Convert all inline elements to plain text
-    content_parts = []
-    for elem in elements:
-        content_parts.append(_element_to_plain_text(elem))
-
-    content = "".join(content_parts)
+    formatters = _PLAIN_TEXT_FORMATTERS
+    content = "".join(
+        [formatters.get(elem.get("type", ""), _unknown_to_plain_text)(elem) for elem in elements]
+    )
     return CodeBlock(content=content)
 
 
-def _element_to_plain_text(element: dict[str, Any]) -> str:
-    """Convert an inline element to plain text for use in code blocks.
+def _unknown_to_plain_text(element: dict[str, Any]) -> str:
+    """Unknown element type - return empty string."""
+    return ""
 
-    Args:
-        element: Inline element dict from rich text
 
-    Returns:
-        Plain text representation of the element
-    """
-    elem_type = element.get("type", "")
-
-    if elem_type == "text":
-        return cast(str, element.get("text", ""))
-
-    elif elem_type == "link":
-        # For links in code blocks, use the URL as plain text
-        return cast(str, element.get("url", ""))
-
-    elif elem_type == "user":
-        # User mention as plain text: <@USER_ID>
-        user_id = element.get("user_id", "")
-        return f"<@{user_id}>"
-
-    elif elem_type == "channel":
-        # Channel mention as plain text: <#CHANNEL_ID>
-        channel_id = element.get("channel_id", "")
-        return f"<#{channel_id}>"
-
-    elif elem_type == "usergroup":
-        # Usergroup mention as plain text: <!subteam^USERGROUP_ID>
-        usergroup_id = element.get("usergroup_id", "")
-        return f"<!subteam^{usergroup_id}>"
-
-    elif elem_type == "emoji":
-        # Prefer unicode, fallback to :name:
-        unicode_str = element.get("unicode")
-        if unicode_str:
-            return cast(str, unicode_str)
-        name = element.get("name", "")
-        return f":{name}:" if name else ""
-
-    elif elem_type == "broadcast":
-        # Broadcast as plain text: <!here>, <!channel>, etc.
-        range_type = element.get("range", "here")
-        return f"<!{range_type}>"
-
-    elif elem_type == "date":
-        # Use fallback text if available, otherwise timestamp
-        fallback = element.get("fallback")
-        if fallback:
-            return cast(str, fallback)
-        timestamp = element.get("timestamp", 0)
-        return str(timestamp)
-
-    elif elem_type == "color":
-        # Color element (hex color code)
-        # This is not yet in the AST, but handle it for completeness
-        value = element.get("value", "")
-        return cast(str, value)
-
-    else:
-        # Unknown element type - return empty string
-        return ""
+# Plain text representation of each inline element type, for use in code blocks
+_PLAIN_TEXT_FORMATTERS: dict[str, Callable[[dict[str, Any]], str]] = {
+    "text": lambda elem: elem.get("text", ""),
+    # For links in code blocks, use the URL as plain text
+    "link": lambda elem: elem.get("url", ""),
+    "user": lambda elem: f"<@{elem.get('user_id', '')}>",
+    "channel": lambda elem: f"<#{elem.get('channel_id', '')}>",
+    "usergroup": lambda elem: f"<!subteam^{elem.get('usergroup_id', '')}>",
+    # Prefer unicode, fallback to :name:
+    "emoji": lambda elem: elem.get("unicode") or (f":{elem['name']}:" if elem.get("name") else ""),
+    "broadcast": lambda elem: f"<!{elem.get('range', 'here')}>",
+    # Use fallback text if available, otherwise timestamp
+    "date": lambda elem: elem.get("fallback") or str(elem.get("timestamp", 0)),
+    # Color element (hex color code); not yet in the AST
+    "color": lambda elem: elem.get("value", ""),
+}
 
 
 def _parse_quote(quote: dict[str, Any]) -> Quote:
     """Parse a rich_text_quote into a Quote."""
     elements = quote.get("elements", [])
     # Parse inline elements into paragraphs
-    paragraph = Paragraph(children=[_parse_inline_element(e) for e in elements])
+    paragraph = Paragraph(children=coalesce_text([_parse_inline_element(e) for e in elements]))
     children: list[BlockNode] = [paragraph]
     return Quote(children=children)
 
 
+_BLOCK_PARSERS: dict[str, Callable[[dict[str, Any]], AnyBlock]] = {
+    "rich_text_section": _parse_section,
+    "rich_text_list": _parse_list,
+    "rich_text_preformatted": _parse_preformatted,
+    "rich_text_quote": _parse_quote,
+}
+
+
 def _parse_inline_element(element: dict[str, Any]) -> AnyInline:
     """Parse an inline-level element."""
-    elem_type = element.get("type", "")
-
-    if elem_type == "text":
-        return _parse_text(element)
-    elif elem_type == "link":
-        return _parse_link(element)
-    elif elem_type == "emoji":
-        return _parse_emoji(element)
-    elif elem_type == "user":
-        return _parse_user(element)
-    elif elem_type == "channel":
-        return _parse_channel(element)
-    elif elem_type == "usergroup":
-        return _parse_usergroup(element)
-    elif elem_type == "date":
-        return _parse_date(element)
-    elif elem_type == "broadcast":
-        return _parse_broadcast(element)
-    else:
+    parser = _INLINE_PARSERS.get(element.get("type", ""))
+    if parser is None:
         # Unknown inline type - return empty text
-        return Text(content="")
+        return make_text("")
+    return parser(element)
 
 
 def _parse_text(text_elem: dict[str, Any]) -> AnyInline:
     """Parse a text element with optional styles."""
     content = text_elem.get("text", "")
-    style = text_elem.get("style", {})
+    style = text_elem.get("style")
+    if not style:
+        # Most text is unstyled
+        return make_text(content)
 
     # Build nested style nodes
     # Note: Slack allows combining code with bold/italic/strike
     if style.get("code"):
         node: AnyInline = Code(content=content)
     else:
-        node = Text(content=content)
+        node = make_text(content)
 
-    # Apply styles in order: bold -> italic -> strikethrough
     # These can be combined with code formatting
-    if style.get("bold"):
-        node = Bold(children=[node])
-    if style.get("italic"):
-        node = Italic(children=[node])
-    if style.get("strike"):
-        node = Strikethrough(children=[node])
-
-    return node
+    return _apply_styles(node, style)
 
 
 def _parse_link(link_elem: dict[str, Any]) -> Link:
     """Parse a link element."""
     url = link_elem.get("url", "")
     text = link_elem.get("text")
-    style = link_elem.get("style", {})
+    style = link_elem.get("style")
 
     # Link text
-    children: list[AnyInline] = []
-    if text:
-        text_node: AnyInline = Text(content=text)
+    if not text:
+        return Link(url=url, children=[])
+    text_node: AnyInline = make_text(text)
+    if style:
         # Apply styles to link text
-        if style.get("bold"):
-            text_node = Bold(children=[text_node])
-        if style.get("italic"):
-            text_node = Italic(children=[text_node])
-        if style.get("strike"):
-            text_node = Strikethrough(children=[text_node])
-        children = [text_node]
+        text_node = _apply_styles(text_node, style)
+    return Link(url=url, children=[text_node])
+
+
+def _apply_styles(node: AnyInline, style: dict[str, Any]) -> AnyInline:
+    """Wrap a node in the formatting its style enables.
 
-    return Link(url=url, children=children)
+    Styles are applied in order: bold -> italic -> strikethrough.
+    """
+    for key, wrapper in _STYLE_WRAPPERS:
+        if style.get(key):
+            node = wrapper(children=[node])
+    return node
+
+
+_STYLE_WRAPPERS: tuple[tuple[str, type[Bold | Italic | Strikethrough]], ...] = (
+    ("bold", Bold),
+    ("italic", Italic),
+    ("strike", Strikethrough),
+)
 
 
 def _parse_emoji(emoji_elem: dict[str, Any]) -> Emoji:
     """Parse an emoji element."""
     name = emoji_elem.get("name", "")
     unicode_str = emoji_elem.get("unicode")
-    return Emoji(name=name, unicode=unicode_str)
+    return make_emoji(name, unicode_str)
 
 
 def _parse_user(user_elem: dict[str, Any]) -> UserMention:
     """Parse a user mention element."""
     user_id = user_elem.get("user_id", "")
     # Slack doesn't include username in Rich Text, will be filled by transformer
+    record_user(user_id)
     return UserMention(user_id=user_id)
 
 
 def _parse_channel(channel_elem: dict[str, Any]) -> ChannelMention:
     """Parse a channel mention element."""
     channel_id = channel_elem.get("channel_id", "")
+    record_channel(channel_id)
     return ChannelMention(channel_id=channel_id)
 
 
 def _parse_usergroup(usergroup_elem: dict[str, Any]) -> UsergroupMention:
     """Parse a usergroup mention element."""
     usergroup_id = usergroup_elem.get("usergroup_id", "")
+    record_usergroup(usergroup_id)
     return UsergroupMention(usergroup_id=usergroup_id)
 
 
@@ -319,4 +282,16 @@ def _parse_date(date_elem: dict[str, Any]) -> DateTimestamp:
 def _parse_broadcast(broadcast_elem: dict[str, Any]) -> Broadcast:
     """Parse a broadcast element."""
     range_type = broadcast_elem.get("range", "here")
-    return Broadcast(range=range_type)
+    return make_broadcast(range_type)
+
+
+_INLINE_PARSERS: dict[str, Callable[[dict[str, Any]], AnyInline]] = {
+    "text": _parse_text,
+    "link": _parse_link,
+    "emoji": _parse_emoji,
+    "user": _parse_user,
+    "channel": _parse_channel,
+    "usergroup": _parse_usergroup,
+    "date": _parse_date,
+    "broadcast": _parse_broadcast,
+}
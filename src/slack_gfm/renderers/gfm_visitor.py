@@ -4,7 +4,10 @@ This renderer uses the visitor pattern to properly handle complex combinations
 of styles (bold, italic, strikethrough) that can be nested in any order.
 """
 
-from urllib.parse import urlencode
+import re
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Any, ClassVar
 
 from ..ast import (
     AnyNode,
@@ -32,6 +35,22 @@ from ..ast import (
 )
 from ..ast.visitor import NodeVisitor
 
+# Backslash plus the markdown special characters, escaped in a single pass
+_ESCAPE_TABLE = str.maketrans({char: f"\\{char}" for char in "\\*_`[]()#+-.!|"})
+_NEEDS_ESCAPE_RE = re.compile(r"[\\*_`\[\]()#+\-.!|]")
+
+# Heading marker for each level, indexed by the level clamped to 1-6
+_HEADING_PREFIXES = ("",) + tuple("#" * level + " " for level in range(1, 7))
+
+# Links for the broadcast ranges Slack defines; other ranges are formatted
+_BROADCAST_LINKS = {
+    broadcast_range: f"[@{broadcast_range}](slack://broadcast?type={broadcast_range})"
+    for broadcast_range in ("here", "channel", "everyone")
+}
+
+# Table separator cell for each column alignment; anything else gets "---"
+_ALIGN_SEPARATORS: dict[str | None, str] = {"left": ":---", "right": "---:", "center": ":---:"}
+
 
 class GFMRenderer(NodeVisitor):
     """Visitor-based GFM renderer.
@@ -40,6 +59,14 @@ class GFMRenderer(NodeVisitor):
     and emitting correct GFM markers.
     """
 
+    # True when visit() is NodeVisitor's own, so child loops may index the
+    # KIND table directly; a subclass overriding visit() sees every child
+    _DIRECT_VISIT: ClassVar[bool] = True
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._DIRECT_VISIT = cls.visit is NodeVisitor.visit
+
     def __init__(self) -> None:
         self.output: list[str] = []
 
@@ -49,29 +76,51 @@ class GFMRenderer(NodeVisitor):
         self.visit(node)
         return "".join(self.output)
 
+    def _render_to_string(self, nodes: Sequence[AnyNode]) -> str:
+        """Render nodes into a fresh buffer and return the joined string.
+
+        The current output buffer is restored afterwards, so nested quotes,
+        lists, links and table cells can each capture their own content.
+        """
+        parent = self.output
+        buffer: list[str] = []
+        self.output = buffer
+        self._visit_children(nodes)
+        self.output = parent
+        return "".join(buffer)
+
+    def _visit_children(self, nodes: Sequence[AnyNode]) -> None:
+        """Render each node in turn through the one dispatch path all loops share."""
+        if self._DIRECT_VISIT:
+            table = self._TABLE
+            for node in nodes:
+                table[node.KIND](self, node)
+        else:
+            for node in nodes:
+                self.visit(node)
+
     # Block-level nodes
 
     def visit_document(self, node: Document) -> Document:
         """Render Document node."""
+        output = self.output
+        last = len(node.children) - 1
         for i, child in enumerate(node.children):
-            self.visit(child)
+            self._visit_children((child,))
             # Add double newline between blocks, except after last
-            if i < len(node.children) - 1:
-                self.output.append("\n\n")
+            if i < last:
+                output.append("\n\n")
         return node
 
     def visit_paragraph(self, node: Paragraph) -> Paragraph:
         """Render Paragraph node."""
-        for child in node.children:
-            self.visit(child)
+        self._visit_children(node.children)
         return node
 
     def visit_heading(self, node: Heading) -> Heading:
         """Render Heading node."""
-        level = max(1, min(6, node.level))  # Clamp to 1-6
-        self.output.append("#" * level + " ")
-        for child in node.children:
-            self.visit(child)
+        self.output.append(_HEADING_PREFIXES[max(1, min(6, node.level))])  # Clamp to 1-6
+        self._visit_children(node.children)
         return node
 
     def visit_codeblock(self, node: CodeBlock) -> CodeBlock:
@@ -99,56 +148,24 @@ class GFMRenderer(NodeVisitor):
     def visit_quote(self, node: Quote) -> Quote:
         """Render Quote node."""
         # Render children and prefix each line with >
-        content_parts = []
-        for child in node.children:
-            # Save current output and render child
-            saved_output = self.output
-            self.output = []
-            self.visit(child)
-            child_content = "".join(self.output)
-            self.output = saved_output
-
-            # Prefix each line with >
-            lines = child_content.split("\n")
-            quoted_lines = [f"> {line}" if line else ">" for line in lines]
-            content_parts.append("\n".join(quoted_lines))
-
-        self.output.append("\n".join(content_parts))
+        quoted = [_quote_lines(self._render_to_string((child,))) for child in node.children]
+        self.output.append("\n".join(quoted))
         return node
 
     def visit_list(self, node: List) -> List:
         """Render List node."""
+        items = []
         for i, item in enumerate(node.children):
-            if node.ordered:
-                num = node.start + i
-                prefix = f"{num}. "
-            else:
-                prefix = "- "
-
-            # Render item content
-            saved_output = self.output
-            self.output = []
-            self.visit(item)
-            item_content = "".join(self.output)
-            self.output = saved_output
-
-            # Handle multiline items
-            lines = item_content.split("\n")
-            if lines:
-                self.output.append(prefix + lines[0])
-                if i < len(node.children) - 1 or len(lines) > 1:
-                    self.output.append("\n")
-                # Indent continuation lines
-                for line in lines[1:]:
-                    self.output.append("  " + line)
-                    if line != lines[-1]:
-                        self.output.append("\n")
+            prefix = f"{node.start + i}. " if node.ordered else "- "
+            # Indent continuation lines of multiline items under the marker
+            item_content = self._render_to_string((item,))
+            items.append(prefix + item_content.replace("\n", "\n  "))
+        self.output.append("\n".join(items))
         return node
 
     def visit_listitem(self, node: ListItem) -> ListItem:
         """Render ListItem node."""
-        for child in node.children:
-            self.visit(child)
+        self._visit_children(node.children)
         return node
 
     def visit_horizontalrule(self, node: HorizontalRule) -> HorizontalRule:
@@ -162,40 +179,17 @@ class GFMRenderer(NodeVisitor):
 
         # Header row
         if node.header:
-            saved_output = self.output
-            header_cells = []
-            for header_cell in node.header:
-                self.output = []
-                for inline_node in header_cell:
-                    self.visit(inline_node)
-                header_cells.append("".join(self.output))
-            self.output = saved_output
+            header_cells = [self._render_to_string(cell) for cell in node.header]
             lines.append("| " + " | ".join(header_cells) + " |")
 
             # Separator row with alignments
-            sep_cells = []
-            for align in node.alignments:
-                if align == "left":
-                    sep_cells.append(":---")
-                elif align == "right":
-                    sep_cells.append("---:")
-                elif align == "center":
-                    sep_cells.append(":---:")
-                else:
-                    sep_cells.append("---")
+            sep_cells = [_ALIGN_SEPARATORS.get(align, "---") for align in node.alignments]
             lines.append("| " + " | ".join(sep_cells) + " |")
 
         # Data rows
-        saved_output = self.output
         for row in node.rows:
-            row_cells_rendered = []
-            for cell in row:
-                self.output = []
-                for inline_node in cell:
-                    self.visit(inline_node)
-                row_cells_rendered.append("".join(self.output))
+            row_cells_rendered = [self._render_to_string(cell) for cell in row]
             lines.append("| " + " | ".join(row_cells_rendered) + " |")
-        self.output = saved_output
 
         self.output.append("\n".join(lines))
         return node
@@ -204,37 +198,32 @@ class GFMRenderer(NodeVisitor):
 
     def visit_text(self, node: Text) -> Text:
         """Render Text node."""
-        # Escape special markdown characters
+        # Escape special markdown characters; most prose has none, so skip
+        # building a translated copy when there is nothing to escape
         content = node.content
-        # Escape backslashes first
-        content = content.replace("\\", "\\\\")
-        # Escape markdown special chars
-        for char in ["*", "_", "`", "[", "]", "(", ")", "#", "+", "-", ".", "!", "|"]:
-            content = content.replace(char, f"\\{char}")
+        if _NEEDS_ESCAPE_RE.search(content):
+            content = content.translate(_ESCAPE_TABLE)
         self.output.append(content)
         return node
 
     def visit_bold(self, node: Bold) -> Bold:
         """Render Bold node."""
         self.output.append("**")
-        for child in node.children:
-            self.visit(child)
+        self._visit_children(node.children)
         self.output.append("**")
         return node
 
     def visit_italic(self, node: Italic) -> Italic:
         """Render Italic node."""
         self.output.append("*")
-        for child in node.children:
-            self.visit(child)
+        self._visit_children(node.children)
         self.output.append("*")
         return node
 
     def visit_strikethrough(self, node: Strikethrough) -> Strikethrough:
         """Render Strikethrough node."""
         self.output.append("~~")
-        for child in node.children:
-            self.visit(child)
+        self._visit_children(node.children)
         self.output.append("~~")
         return node
 
@@ -248,15 +237,7 @@ class GFMRenderer(NodeVisitor):
     def visit_link(self, node: Link) -> Link:
         """Render Link node."""
         # Render link text
-        saved_output = self.output
-        self.output = []
-        if node.children:
-            for child in node.children:
-                self.visit(child)
-            text = "".join(self.output)
-        else:
-            text = node.url
-        self.output = saved_output
+        text = self._render_to_string(node.children) if node.children else node.url
 
         # Escape special chars in URL
         url = node.url.replace("(", "%28").replace(")", "%29")
@@ -265,56 +246,39 @@ class GFMRenderer(NodeVisitor):
 
     def visit_usermention(self, node: UserMention) -> UserMention:
         """Render UserMention as GFM link with slack:// URL."""
-        display = f"@{node.username}" if node.username else node.user_id
-        params = {"id": node.user_id}
-        if node.username:
-            params["name"] = node.username
-        url = f"slack://user?{urlencode(params)}"
-        self.output.append(f"[{display}]({url})")
+        self.output.append(_mention_link("user", "@", node.user_id, node.username))
         return node
 
     def visit_channelmention(self, node: ChannelMention) -> ChannelMention:
         """Render ChannelMention as GFM link with slack:// URL."""
-        display = f"#{node.channel_name}" if node.channel_name else node.channel_id
-        params = {"id": node.channel_id}
-        if node.channel_name:
-            params["name"] = node.channel_name
-        url = f"slack://channel?{urlencode(params)}"
-        self.output.append(f"[{display}]({url})")
+        self.output.append(_mention_link("channel", "#", node.channel_id, node.channel_name))
         return node
 
     def visit_usergroupmention(self, node: UsergroupMention) -> UsergroupMention:
         """Render UsergroupMention as GFM link with slack:// URL."""
-        display = f"@{node.usergroup_name}" if node.usergroup_name else node.usergroup_id
-        params = {"id": node.usergroup_id}
-        if node.usergroup_name:
-            params["name"] = node.usergroup_name
-        url = f"slack://usergroup?{urlencode(params)}"
-        self.output.append(f"[{display}]({url})")
+        self.output.append(_mention_link("usergroup", "@", node.usergroup_id, node.usergroup_name))
         return node
 
     def visit_broadcast(self, node: Broadcast) -> Broadcast:
         """Render Broadcast as GFM link with slack:// URL."""
-        display = f"@{node.range}"
-        url = f"slack://broadcast?type={node.range}"
-        self.output.append(f"[{display}]({url})")
+        link = _BROADCAST_LINKS.get(node.range)
+        if link is None:
+            link = f"[@{node.range}](slack://broadcast?type={node.range})"
+        self.output.append(link)
         return node
 
     def visit_emoji(self, node: Emoji) -> Emoji:
         """Render Emoji."""
-        if node.unicode:
-            self.output.append(node.unicode)
-        else:
-            self.output.append(f":{node.name}:")
+        self.output.append(node.unicode or f":{node.name}:")
         return node
 
     def visit_datetimestamp(self, node: DateTimestamp) -> DateTimestamp:
         """Render DateTimestamp as GFM link with slack:// URL."""
-        display = node.fallback or str(node.timestamp)
-        params = {"ts": str(node.timestamp)}
+        ts = str(node.timestamp)
+        display = node.fallback or ts
+        url = f"slack://date?ts={_quote(ts)}"
         if node.format:
-            params["format"] = node.format
-        url = f"slack://date?{urlencode(params)}"
+            url += f"&format={_quote(node.format)}"
         self.output.append(f"[{display}]({url})")
         return node
 
@@ -330,3 +294,36 @@ def render_gfm_visitor(node: AnyNode) -> str:
     """
     renderer = GFMRenderer()
     return renderer.render(node)
+
+
+def _quote_lines(content: str) -> str:
+    """Prefix every line with "> ", or a bare ">" for empty lines."""
+    if content and "\n\n" not in content and content[0] != "\n" and content[-1] != "\n":
+        # No empty lines, so one replace prefixes them all
+        return "> " + content.replace("\n", "\n> ")
+    return "\n".join(f"> {line}" if line else ">" for line in content.split("\n"))
+
+
+@lru_cache(maxsize=1024)
+def _mention_link(kind: str, sigil: str, mention_id: str, name: str | None) -> str:
+    """Build the GFM link for a mention.
+
+    The link depends only on the mention's fields, and the same users and
+    channels come up again and again, so recent links are remembered.
+    """
+    if name:
+        return f"[{sigil}{name}](slack://{kind}?id={_quote(mention_id)}&name={_quote(name)})"
+    return f"[{mention_id}](slack://{kind}?id={_quote(mention_id)})"
+
+
+def _quote(value: str) -> str:
+    """Quote a slack:// query value exactly as urlencode would.
+
+    Slack IDs and most names are plain ASCII alphanumerics that need no
+    quoting, so urllib.parse is only imported for the rest.
+    """
+    if value.isalnum() and value.isascii():
+        return value
+    from urllib.parse import quote_plus
+
+    return quote_plus(value, safe="")
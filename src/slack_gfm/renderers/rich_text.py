@@ -3,7 +3,8 @@
 Converts AST to Slack Rich Text JSON structure.
 """
 
-from typing import Any
+from collections.abc import Callable, Sequence
+from typing import Any, cast
 
 from ..ast import (
     AnyBlock,
@@ -29,6 +30,7 @@ from ..ast import (
     UsergroupMention,
     UserMention,
 )
+from ..ast.nodes import _INLINE_SET
 
 
 def render_rich_text(node: AnyNode) -> dict[str, Any]:
@@ -55,20 +57,15 @@ def render_rich_text(node: AnyNode) -> dict[str, Any]:
 
 def _render_block(node: AnyBlock) -> dict[str, Any]:
     """Render a block-level node."""
-    if isinstance(node, Paragraph):
-        return _render_paragraph(node)
-    elif isinstance(node, Heading):
-        # Rich Text doesn't have headings - render as bold paragraph
-        return _render_heading_as_paragraph(node)
-    elif isinstance(node, CodeBlock):
-        return _render_codeblock(node)
-    elif isinstance(node, Quote):
-        return _render_quote(node)
-    elif isinstance(node, List):
-        return _render_list(node)
-    else:
-        # Unknown block type - render as empty section
-        return {"type": "rich_text_section", "elements": []}
+    render = _BLOCK_RENDERERS.get(type(node))
+    if render is None:
+        render = _resolve_renderer(_BLOCK_RENDERERS, type(node), _render_unknown_block)
+    return render(node)
+
+
+def _render_unknown_block(node: AnyBlock) -> dict[str, Any]:
+    """Unknown block type - render as empty section."""
+    return {"type": "rich_text_section", "elements": []}
 
 
 def _render_paragraph(para: Paragraph) -> dict[str, Any]:
@@ -123,7 +120,10 @@ def _render_list(list_node: List) -> dict[str, Any]:
     for item in list_node.children:
         # Each item is a rich_text_section
         # Filter only inline elements from ListItem children
-        inline_children = [c for c in item.children if isinstance(c, InlineNode)]
+        inline_children = cast(
+            list[InlineNode],
+            [c for c in item.children if type(c) in _INLINE_SET or isinstance(c, InlineNode)],
+        )
         item_elements = [_render_inline(child) for child in inline_children]
         elements.append({"type": "rich_text_section", "elements": item_elements})
 
@@ -137,32 +137,15 @@ def _render_list(list_node: List) -> dict[str, Any]:
 
 def _render_inline(node: AnyInline) -> dict[str, Any]:
     """Render an inline-level node."""
-    if isinstance(node, Text):
-        return _render_text(node)
-    elif isinstance(node, Bold):
-        return _render_bold(node)
-    elif isinstance(node, Italic):
-        return _render_italic(node)
-    elif isinstance(node, Strikethrough):
-        return _render_strikethrough(node)
-    elif isinstance(node, Code):
-        return _render_code(node)
-    elif isinstance(node, Link):
-        return _render_link(node)
-    elif isinstance(node, UserMention):
-        return _render_user_mention(node)
-    elif isinstance(node, ChannelMention):
-        return _render_channel_mention(node)
-    elif isinstance(node, UsergroupMention):
-        return _render_usergroup_mention(node)
-    elif isinstance(node, Broadcast):
-        return _render_broadcast(node)
-    elif isinstance(node, Emoji):
-        return _render_emoji(node)
-    elif isinstance(node, DateTimestamp):
-        return _render_date(node)
-    else:
-        return {"type": "text", "text": ""}
+    render = _INLINE_RENDERERS.get(type(node))
+    if render is None:
+        render = _resolve_renderer(_INLINE_RENDERERS, type(node), _render_unknown_inline)
+    return render(node)
+
+
+def _render_unknown_inline(node: AnyInline) -> dict[str, Any]:
+    """Unknown inline type - render as empty text."""
+    return {"type": "text", "text": ""}
 
 
 def _render_text(text: Text) -> dict[str, Any]:
@@ -244,7 +227,52 @@ def _render_date(date: DateTimestamp) -> dict[str, Any]:
     return elem
 
 
-def _extract_text_from_inlines(inlines: list[AnyInline]) -> str:
+_Renderer = Callable[[Any], dict[str, Any]]
+
+# Renderers by exact node class; subclasses are resolved and added on first use
+_BLOCK_RENDERERS: dict[type, _Renderer] = {
+    Paragraph: _render_paragraph,
+    # Rich Text doesn't have headings - render as bold paragraph
+    Heading: _render_heading_as_paragraph,
+    CodeBlock: _render_codeblock,
+    Quote: _render_quote,
+    List: _render_list,
+}
+_INLINE_RENDERERS: dict[type, _Renderer] = {
+    Text: _render_text,
+    Bold: _render_bold,
+    Italic: _render_italic,
+    Strikethrough: _render_strikethrough,
+    Code: _render_code,
+    Link: _render_link,
+    UserMention: _render_user_mention,
+    ChannelMention: _render_channel_mention,
+    UsergroupMention: _render_usergroup_mention,
+    Broadcast: _render_broadcast,
+    Emoji: _render_emoji,
+    DateTimestamp: _render_date,
+}
+
+
+def _resolve_renderer(
+    renderers: dict[type, _Renderer], node_cls: type, default: _Renderer
+) -> _Renderer:
+    """Find and cache the renderer for a node class not seen before.
+
+    Walks the node class's MRO, so a subclass of a built-in node renders like
+    its parent, as it did when dispatch used isinstance checks.
+    """
+    for base in node_cls.__mro__:
+        render = renderers.get(base)
+        if render is not None:
+            break
+    else:
+        render = default
+    renderers[node_cls] = render
+    return render
+
+
+def _extract_text_from_inlines(inlines: Sequence[AnyInline]) -> str:
     """Extract plain text content from inline nodes."""
     parts = []
     for node in inlines:
@@ -252,6 +280,6 @@ def _extract_text_from_inlines(inlines: list[AnyInline]) -> str:
             parts.append(node.content)
         elif isinstance(node, Code):
             parts.append(node.content)
-        elif hasattr(node, "children"):
-            parts.append(_extract_text_from_inlines(node.children))
+        elif node._HAS_CHILDREN:
+            parts.append(_extract_text_from_inlines(cast(Any, node).children))
     return "".join(parts)
@@ -1,6 +1,9 @@
 """Basic conversion tests for slack-gfm."""
 
-from slack_gfm import gfm_to_rich_text, mrkdwn_to_gfm, rich_text_to_gfm
+import pytest
+
+import slack_gfm
+from slack_gfm import gfm_to_rich_text, mrkdwn_to_gfm, rich_text_batch_to_gfm, rich_text_to_gfm
 
 
 class TestRichTextToGFM:
@@ -185,3 +188,56 @@ class TestRoundTrip:
         # Should have user element with correct ID
         user_elem = next(elem for elem in elements if elem.get("type") == "user")
         assert user_elem["user_id"] == "U123"
+
+
+class TestBatchConversion:
+    """Test batch Rich Text to GFM conversion."""
+
+    ITEMS = [
+        [{"type": "rich_text_section", "elements": [{"type": "text", "text": "Hello"}]}],
+        [{"type": "rich_text_section", "elements": [{"type": "user", "user_id": "U123"}]}],
+        {
+            "type": "rich_text",
+            "elements": [
+                {"type": "rich_text_section", "elements": [{"type": "channel", "channel_id": "C1"}]}
+            ],
+        },
+    ]
+
+    def test_batch_matches_single(self) -> None:
+        """Test that batch output matches converting items one by one."""
+        maps = {"user_map": {"U123": "john"}, "channel_map": {"C1": "general"}}
+        expected = [rich_text_to_gfm(item, **maps) for item in self.ITEMS]
+        assert rich_text_batch_to_gfm(self.ITEMS, **maps) == expected
+        assert rich_text_batch_to_gfm(iter(self.ITEMS)) == [
+            rich_text_to_gfm(item) for item in self.ITEMS
+        ]
+
+    def test_batch_with_workers(self) -> None:
+        """Test batch conversion in a process pool."""
+        maps = {"user_map": {"U123": "john"}}
+        expected = [rich_text_to_gfm(item, **maps) for item in self.ITEMS]
+        assert rich_text_batch_to_gfm(self.ITEMS, workers=2, **maps) == expected
+
+
+class TestLazyExports:
+    """Test lazily imported top-level names."""
+
+    def test_lazy_names_resolve(self) -> None:
+        """Test that parser, renderer and transformer names resolve on access."""
+        from slack_gfm.parsers.gfm import parse_gfm
+        from slack_gfm.transformers.mappings import IDMapper
+
+        assert slack_gfm.parse_gfm is parse_gfm
+        assert slack_gfm.IDMapper is IDMapper
+        assert "render_gfm" in dir(slack_gfm)
+        for name in slack_gfm.__all__:
+            assert hasattr(slack_gfm, name)
+
+    def test_unknown_name_raises(self) -> None:
+        """Test that unknown attributes still raise AttributeError."""
+        with pytest.raises(AttributeError):
+            _ = slack_gfm.does_not_exist  # type: ignore[attr-defined]
+        with pytest.raises(AttributeError):
+            _ = slack_gfm.parsers.does_not_exist  # type: ignore[attr-defined]
+        assert "parse_mrkdwn" in dir(slack_gfm.parsers)
@@ -197,6 +197,21 @@ class TestRendererEdgeCases:
         # Should still have URL as text when no children
         assert elem.get("text") or elem.get("url")
 
+    def test_default_children_are_empty_lists(self) -> None:
+        """Test that childless containers default to a fresh, renderable empty list."""
+        from slack_gfm.ast import Bold, Link
+
+        assert Paragraph() == Paragraph(children=[])
+        assert Document() == Document(children=[])
+        assert Link(url="u") == Link(url="u", children=[])
+        assert Bold().children is not Paragraph().children
+        para = Paragraph()
+        para.children.append(Bold())
+        assert para.children == [Bold()]
+        doc = Document(children=[Paragraph(children=[Bold(), Link(url="https://example.com")])])
+        assert "https://example.com" in render_gfm(doc)
+        assert render_rich_text(doc)["elements"][0]["elements"][-1]["type"] == "link"
+
 
 class TestConversionEdgeCases:
     """Test edge cases in high-level conversion functions."""
@@ -32,6 +32,13 @@ class TestSlackGFMError:
         assert "element_type='unknown'" in str(exc)
         assert "position=42" in str(exc)
 
+    def test_exception_str_reflects_updated_context(self) -> None:
+        """Test that str() picks up context added after the first call."""
+        exc = SlackGFMError("bad", context={"a": 1})
+        assert str(exc) == "bad (context: a=1)"
+        exc.context["b"] = 2
+        assert str(exc) == "bad (context: a=1, b=2)"
+
     def test_exception_repr(self) -> None:
         """Test exception representation."""
         exc = SlackGFMError("Error", context={"foo": "bar"})
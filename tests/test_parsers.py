@@ -8,6 +8,8 @@ from slack_gfm.ast import (
     ChannelMention,
     Code,
     CodeBlock,
+    Document,
+    Emoji,
     Heading,
     Italic,
     Link,
@@ -93,6 +95,44 @@ class TestGFMParser:
         para = cast(Paragraph, ast.children[0])
         assert isinstance(para.children[0], UsergroupMention)
 
+    def test_parse_slack_url_with_encoded_query(self) -> None:
+        """Test that slack:// query values are decoded like parse_qs would."""
+        ast = parse_gfm("[@John Doe](slack://user?id=&id=U1&name=John+Doe%21#x)")
+        user = cast(Paragraph, ast.children[0]).children[0]
+        assert user == UserMention(user_id="U1", username="John Doe!")
+
+    def test_nested_same_style_spans_whole_range(self) -> None:
+        """Test that a nested span of the same type doesn't close the outer one."""
+        para = cast(Paragraph, parse_gfm("*a *b* c* d").children[0])
+        assert para.children == [Italic(children=[Text(content="a b c")]), Text(content=" d")]
+
+    def test_plain_text_fast_path(self) -> None:
+        """Test that plain messages skip markdown-it but parse the same."""
+        from slack_gfm.parsers.gfm import _is_plain_text
+
+        assert _is_plain_text("just a plain message")
+        assert parse_gfm("just a plain message") == Document(
+            children=[Paragraph(children=[Text(content="just a plain message")])]
+        )
+        # Bare domains are still linkified, and padding is still trimmed
+        assert not _is_plain_text("see example com.org")
+        assert not _is_plain_text(" padded")
+        link = cast(Paragraph, parse_gfm("see example.com").children[0]).children[1]
+        assert isinstance(link, Link)
+
+    def test_markdown_instance_is_per_thread(self) -> None:
+        """Test that the MarkdownIt instance is reused within a thread only."""
+        import threading
+
+        from slack_gfm.parsers.gfm import _get_markdown
+
+        assert _get_markdown() is _get_markdown()
+        others = []
+        worker = threading.Thread(target=lambda: others.append(_get_markdown()))
+        worker.start()
+        worker.join()
+        assert others[0] is not _get_markdown()
+
 
 class TestMrkdwnParser:
     """Test mrkdwn parser."""
@@ -186,6 +226,20 @@ class TestMrkdwnParser:
         assert not ast.children[0].ordered
         assert len(ast.children[0].children) == 2
 
+    def test_plain_text_fast_path(self) -> None:
+        """Test that plain messages skip the tokenizer but parse the same."""
+        from slack_gfm.parsers.mrkdwn import _is_plain_text
+
+        assert _is_plain_text("just a plain message")
+        assert parse_mrkdwn("just a plain message") == Document(
+            children=[Paragraph(children=[Text(content="just a plain message")])]
+        )
+        # Line-start markers only count at the very start of a one-line message
+        assert _is_plain_text("see item 1. and 2.")
+        assert not _is_plain_text("1. first")
+        assert not _is_plain_text("&gt; quoted")
+        assert isinstance(parse_mrkdwn("• item").children[0], List)
+
 
 class TestRichTextParser:
     """Test Rich Text parser."""
@@ -358,6 +412,52 @@ class TestRichTextParser:
         ast = parse_rich_text(elements)
         assert len(ast.children) == 1
 
+    def test_repeated_leaves_are_shared(self) -> None:
+        """Test that identical small leaves reuse the same node instance."""
+        rich_text = {
+            "type": "rich_text",
+            "elements": [
+                {
+                    "type": "rich_text_section",
+                    "elements": [
+                        {"type": "emoji", "name": "smile"},
+                        {"type": "text", "text": " "},
+                        {"type": "emoji", "name": "smile"},
+                        {"type": "text", "text": " "},
+                        {"type": "broadcast", "range": "here"},
+                    ],
+                }
+            ],
+        }
+        para = cast(Paragraph, parse_rich_text(rich_text).children[0])
+        assert para.children[0] is para.children[2]
+        assert para.children[1] is para.children[3]
+        assert isinstance(para.children[4], Broadcast)
+        assert para.children[4].range == "here"
+
+    def test_adjacent_text_is_merged(self) -> None:
+        """Test that consecutive text elements become a single Text node."""
+        rich_text = {
+            "type": "rich_text",
+            "elements": [
+                {
+                    "type": "rich_text_section",
+                    "elements": [
+                        {"type": "text", "text": "Hello "},
+                        {"type": "text", "text": "world"},
+                        {"type": "emoji", "name": "smile"},
+                        {"type": "text", "text": "!"},
+                    ],
+                }
+            ],
+        }
+        para = cast(Paragraph, parse_rich_text(rich_text).children[0])
+        assert para.children == [
+            Text(content="Hello world"),
+            Emoji(name="smile"),
+            Text(content="!"),
+        ]
+
 
 class TestMrkdwnCodeBlockEdgeCases:
     """Test mrkdwn code block parsing edge cases that cause escaping bugs."""
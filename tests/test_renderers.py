@@ -114,6 +114,21 @@ class TestGFMRenderer:
         assert "1. First" in result
         assert "2. Second" in result
 
+    def test_render_list_multiline_items(self) -> None:
+        """Test that continuation lines are indented and items stay separate."""
+        doc = Document(
+            children=[
+                List(
+                    ordered=False,
+                    children=[
+                        ListItem(children=[Text(content="a\nb\nb")]),
+                        ListItem(children=[Text(content="c")]),
+                    ],
+                )
+            ]
+        )
+        assert render_gfm(doc) == "- a\n  b\n  b\n- c"
+
     def test_render_quote(self) -> None:
         """Test quote rendering."""
         doc = Document(
@@ -122,6 +137,20 @@ class TestGFMRenderer:
         result = render_gfm(doc)
         assert "> quoted text" in result
 
+    def test_render_quote_empty_lines(self) -> None:
+        """Test that empty quoted lines get a bare > marker."""
+        doc = Document(
+            children=[
+                Quote(
+                    children=[
+                        Paragraph(children=[Text(content="one\n\ntwo\n")]),
+                        Paragraph(children=[Text(content="three\nfour")]),
+                    ]
+                )
+            ]
+        )
+        assert render_gfm(doc) == "> one\n>\n> two\n>\n> three\n> four"
+
     def test_render_link(self) -> None:
         """Test link rendering."""
         doc = Document(
@@ -183,6 +212,34 @@ class TestGFMRenderer:
         result = render_gfm(doc)
         assert "---" in result
 
+    def test_overridden_visit_sees_every_child(self) -> None:
+        """Test that a GFMRenderer subclass overriding visit() sees all children."""
+        from slack_gfm.ast import AnyNode
+        from slack_gfm.renderers.gfm_visitor import GFMRenderer
+
+        class UpperText(GFMRenderer):
+            def visit(self, node: AnyNode) -> AnyNode:
+                if isinstance(node, Text):
+                    return super().visit(Text(content=node.content.upper()))
+                return super().visit(node)
+
+        doc = Document(
+            children=[
+                Heading(level=1, children=[Text(content="h")]),
+                Paragraph(
+                    children=[
+                        Text(content="p"),
+                        Bold(children=[Text(content="b")]),
+                        Italic(children=[Text(content="i")]),
+                        Strikethrough(children=[Text(content="s")]),
+                    ]
+                ),
+                List(ordered=False, children=[ListItem(children=[Text(content="l")])]),
+                Quote(children=[Paragraph(children=[Text(content="q")])]),
+            ]
+        )
+        assert UpperText().render(doc) == "# H\n\nP**B***I*~~S~~\n\n- L\n\n> Q"
+
 
 class TestRichTextRenderer:
     """Test Rich Text renderer."""
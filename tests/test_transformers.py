@@ -1,6 +1,8 @@
 """Transformer tests."""
 
-from typing import cast
+from typing import Any, cast
+
+import pytest
 
 from slack_gfm.ast import (
     ChannelMention,
@@ -134,3 +136,144 @@ class TestApplyIDMappings:
         assert children[0].username == "john"
         assert children[2].channel_name == "general"
         assert children[4].usergroup_name == "engineers"
+
+
+class TestMappingShortCircuit:
+    """Test that convenience functions only run the mapping pass when needed."""
+
+    @pytest.fixture
+    def no_mapping(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Make apply_id_mappings fail if it is called."""
+        from slack_gfm.transformers import mappings
+
+        def fail(*args: Any, **kwargs: Any) -> Any:
+            raise AssertionError("apply_id_mappings should not be called")
+
+        monkeypatch.setattr(mappings, "apply_id_mappings", fail)
+
+    @pytest.mark.usefixtures("no_mapping")
+    def test_skip_when_no_mentioned_id_is_mapped(self) -> None:
+        """Test that unrelated map entries don't trigger a mapping pass."""
+        from slack_gfm import gfm_to_rich_text, mrkdwn_to_gfm, rich_text_to_gfm
+
+        rich_text = [
+            {
+                "type": "rich_text_section",
+                "elements": [{"type": "user", "user_id": "U999"}],
+            }
+        ]
+        assert rich_text_to_gfm(rich_text, user_map={"U123": "john"}) == (
+            "[U999](slack://user?id=U999)"
+        )
+        assert mrkdwn_to_gfm("hi <#C999>", channel_map={"C123": "general"}).endswith(
+            "(slack://channel?id=C999)"
+        )
+        gfm_to_rich_text("[S1](slack://usergroup?id=S1)", usergroup_map={"S2": "eng"})
+
+    def test_stats_record_mentions(self) -> None:
+        """Test that parsing records the mentioned IDs."""
+        from slack_gfm.parsers.gfm import _parse_gfm_with_stats
+        from slack_gfm.parsers.mrkdwn import _parse_mrkdwn_with_stats
+        from slack_gfm.parsers.rich_text import _parse_rich_text_with_stats
+
+        _, stats = _parse_gfm_with_stats(
+            "[a](slack://user?id=U1) [b](slack://channel?id=C1) [c](slack://usergroup?id=S1)"
+        )
+        assert stats.mentioned_users == {"U1"}
+        assert stats.needs_mapping(channel_map={"C1": "general"})
+        assert stats.needs_mapping(usergroup_map={"S1": "eng"})
+        assert not stats.needs_mapping(user_map={"U2": "jane"})
+
+        _, stats = _parse_mrkdwn_with_stats("<@U1|john> <#C1>")
+        assert stats.mentioned_users == {"U1"}
+        assert stats.mentioned_channels == {"C1"}
+
+        _, stats = _parse_rich_text_with_stats(
+            [
+                {
+                    "type": "rich_text_section",
+                    "elements": [
+                        {"type": "channel", "channel_id": "C1"},
+                        {"type": "usergroup", "usergroup_id": "S1"},
+                    ],
+                }
+            ]
+        )
+        assert stats.mentioned_channels == {"C1"}
+        assert stats.mentioned_usergroups == {"S1"}
+
+    def test_cached_parse_keeps_stats(self) -> None:
+        """Test that a cached parse still reports its mentions."""
+        from slack_gfm.parsers import parse_gfm
+        from slack_gfm.parsers._stats import collect_stats
+        from slack_gfm.parsers.gfm import _parse_gfm_with_stats
+
+        gfm = "[x](slack://user?id=U42)"
+        assert _parse_gfm_with_stats(gfm)[0] is _parse_gfm_with_stats(gfm)[0]
+        with collect_stats() as stats:
+            parse_gfm(gfm)
+        assert stats.mentioned_users == {"U42"}
+        _, cached = _parse_gfm_with_stats(gfm)
+        assert cached.needs_mapping(user_map={"U42": "zoe"})
+
+    def test_cached_parse_is_not_shared(self) -> None:
+        """Test that changing a parsed tree doesn't leak into later parses."""
+        from slack_gfm.parsers import parse_gfm
+
+        gfm = "**Hello** world\n\n- a\n- b"
+        doc = parse_gfm(gfm)
+        cast(list[Any], doc.children).append(Paragraph())
+        cast(list[Any], cast(Paragraph, doc.children[0]).children).clear()
+        again = parse_gfm(gfm)
+        assert again is not doc
+        assert len(again.children) == 2
+        assert cast(Paragraph, again.children[0]).children
+
+    def test_cached_mrkdwn_parse_is_not_shared(self) -> None:
+        """Test that changing a parsed mrkdwn tree doesn't leak into later parses."""
+        from slack_gfm.parsers import parse_mrkdwn
+
+        mrkdwn = "*Hello* world\n• a\n• b"
+        doc = parse_mrkdwn(mrkdwn)
+        count = len(doc.children)
+        cast(list[Any], doc.children).append(Paragraph())
+        cast(list[Any], cast(Paragraph, doc.children[0]).children).clear()
+        again = parse_mrkdwn(mrkdwn)
+        assert again is not doc
+        assert len(again.children) == count
+        assert cast(Paragraph, again.children[0]).children
+
+    def test_cached_mrkdwn_parse_keeps_stats(self) -> None:
+        """Test that a cached mrkdwn parse still reports its mentions."""
+        from slack_gfm.parsers import parse_mrkdwn
+        from slack_gfm.parsers._stats import collect_stats
+        from slack_gfm.parsers.mrkdwn import _parse_mrkdwn_with_stats
+
+        mrkdwn = "hi <@U42> in <#C7>"
+        assert _parse_mrkdwn_with_stats(mrkdwn)[0] is _parse_mrkdwn_with_stats(mrkdwn)[0]
+        with collect_stats() as stats:
+            parse_mrkdwn(mrkdwn)
+        assert stats.mentioned_users == {"U42"}
+        assert stats.mentioned_channels == {"C7"}
+
+    def test_mrkdwn_to_gfm_cache_respects_maps(self) -> None:
+        """Test that cached mrkdwn output is only reused when no maps are given."""
+        from slack_gfm import mrkdwn_to_gfm
+
+        mrkdwn = "ping <@U42>"
+        assert mrkdwn_to_gfm(mrkdwn) == "ping [U42](slack://user?id=U42)"
+        assert mrkdwn_to_gfm(mrkdwn) == "ping [U42](slack://user?id=U42)"
+        assert mrkdwn_to_gfm(mrkdwn, user_map={"U42": "zoe"}) == (
+            "ping [@zoe](slack://user?id=U42&name=zoe)"
+        )
+
+    def test_mrkdwn_to_gfm_cache_does_not_pin_parse(self) -> None:
+        """Test that cached mrkdwn output doesn't also keep the parsed tree alive."""
+        from slack_gfm import mrkdwn_to_gfm
+        from slack_gfm.parsers.mrkdwn import _parse_mrkdwn_cached
+
+        before = _parse_mrkdwn_cached.cache_info().currsize
+        assert (
+            mrkdwn_to_gfm("*only* rendered <@U7>") == "**only** rendered [U7](slack://user?id=U7)"
+        )
+        assert _parse_mrkdwn_cached.cache_info().currsize == before
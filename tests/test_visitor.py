@@ -3,10 +3,12 @@
 from typing import cast
 
 from slack_gfm.ast import (
+    AnyNode,
     Bold,
     Document,
     NodeVisitor,
     Paragraph,
+    Table,
     Text,
     UserMention,
     transform_ast,
@@ -109,3 +111,164 @@ class TestNodeVisitor:
         visitor = CountVisitor()
         transform_ast(doc, visitor)
         assert visitor.count == 3
+
+    def test_noop_visit_returns_same_tree(self) -> None:
+        """Test that a visitor that changes nothing returns the original nodes."""
+        para = Paragraph(children=[Bold(children=[Text(content="a")]), Text(content="b")])
+        doc = Document(children=[para])
+        result = NodeVisitor().visit(doc)
+        assert result is doc
+
+    def test_visit_table_cells(self) -> None:
+        """Test that table header and row cells are visited."""
+        from dataclasses import replace
+
+        class UpperVisitor(NodeVisitor):
+            def visit_text(self, node: Text) -> Text:
+                return replace(node, content=node.content.upper())
+
+        table = Table(
+            header=[[Text(content="h1")], [Text(content="h2")]],
+            rows=[[[Text(content="a")], [Text(content="b")]]],
+        )
+        result = cast(Table, UpperVisitor().visit(table))
+        assert [cast(Text, c[0]).content for c in result.header] == ["H1", "H2"]
+        assert [cast(Text, c[0]).content for c in result.rows[0]] == ["A", "B"]
+        # Unchanged tables are returned as-is
+        assert NodeVisitor().visit(table) is table
+
+    def test_table_skipped_only_when_cells_cannot_change(self) -> None:
+        """Test the table fast path is limited to visitors with default inline methods."""
+
+        class BlockOnly(NodeVisitor):
+            def visit_paragraph(self, node: Paragraph) -> Paragraph:
+                return node
+
+        class CustomInline(NodeVisitor):
+            def visit_spoiler(self, node: Text) -> Text:
+                return node
+
+        class CustomGeneric(NodeVisitor):
+            def generic_visit(self, node):  # type: ignore[no-untyped-def]
+                return node
+
+        assert NodeVisitor._TABLE_SAFE
+        assert BlockOnly._TABLE_SAFE
+        assert not CustomInline._TABLE_SAFE
+        assert not CustomGeneric._TABLE_SAFE
+
+    def test_visit_custom_node_type(self) -> None:
+        """Test dispatch to visit_* methods for node types defined outside the library."""
+        from dataclasses import dataclass
+
+        from slack_gfm.ast import InlineNode
+
+        @dataclass(frozen=True)
+        class Spoiler(InlineNode):
+            content: str
+
+        class SpoilerVisitor(NodeVisitor):
+            def visit_spoiler(self, node: Spoiler) -> Text:
+                return Text(content="[spoiler]")
+
+        doc = Document(children=[Paragraph(children=[Spoiler(content="secret")])])
+        result = cast(Document, transform_ast(doc, SpoilerVisitor()))
+        text = cast(Text, cast(Paragraph, result.children[0]).children[0])
+        assert text.content == "[spoiler]"
+
+    def test_subclass_of_builtin_node_does_not_inherit_kind(self) -> None:
+        """Test that subclasses of built-in nodes dispatch by their own name."""
+        from dataclasses import dataclass
+
+        @dataclass(frozen=True)
+        class Shout(Text):
+            pass
+
+        class ShoutVisitor(NodeVisitor):
+            def visit_shout(self, node: Shout) -> Text:
+                return Text(content=node.content.upper())
+
+        assert Text.KIND >= 0
+        assert Shout.KIND == -1
+        result = cast(Text, ShoutVisitor().visit(Shout(content="hi")))
+        assert result.content == "HI"
+        # Plain Text still uses the inherited default
+        assert ShoutVisitor().visit(Text(content="hi")) == Text(content="hi")
+
+    def test_subclass_falls_back_to_parent_visit_method(self) -> None:
+        """Test that a node subclass without its own method uses its parent's."""
+        from dataclasses import dataclass
+
+        @dataclass(frozen=True)
+        class Whisper(Text):
+            pass
+
+        class Upper(NodeVisitor):
+            def visit_text(self, node: Text) -> Text:
+                return Text(content=node.content.upper())
+
+        doc = Document(children=[Paragraph(children=[Whisper(content="psst")])])
+        result = cast(Document, transform_ast(doc, Upper()))
+        assert cast(Paragraph, result.children[0]).children == [Text(content="PSST")]
+
+    def test_transform_ast_deep_nesting(self) -> None:
+        """Test transform_ast on nesting deeper than the recursion limit."""
+        import sys
+
+        from slack_gfm.ast import Quote
+        from slack_gfm.transformers import IDMapper
+
+        depth = sys.getrecursionlimit() + 100
+        node: Quote | Paragraph = Paragraph(children=[UserMention(user_id="U123")])
+        for _ in range(depth):
+            node = Quote(children=[node])
+
+        result = transform_ast(node, IDMapper(user_map={"U123": "john"}))
+        for _ in range(depth):
+            assert isinstance(result, Quote)
+            result = result.children[0]
+        user = cast(UserMention, cast(Paragraph, result).children[0])
+        assert user.username == "john"
+
+    def test_transform_ast_overridden_container(self) -> None:
+        """Test that overridden container methods still receive the whole subtree."""
+
+        class DropBold(NodeVisitor):
+            def visit_bold(self, node: Bold) -> Text:
+                return Text(content="dropped")
+
+        doc = Document(
+            children=[Paragraph(children=[Bold(children=[Text(content="x")]), Text(content="y")])]
+        )
+        result = cast(Document, transform_ast(doc, DropBold()))
+        para = cast(Paragraph, result.children[0])
+        assert [cast(Text, c).content for c in para.children] == ["dropped", "y"]
+
+    def test_transform_ast_overridden_visit(self) -> None:
+        """Test that a visitor overriding visit() itself is still applied."""
+
+        class UpperVisit(NodeVisitor):
+            def visit(self, node: AnyNode) -> AnyNode:
+                if isinstance(node, Text):
+                    return Text(content=node.content.upper())
+                return super().visit(node)
+
+        doc = Document(children=[Paragraph(children=[Text(content="hi")])])
+        result = cast(Document, transform_ast(doc, UpperVisit()))
+        text = cast(Text, cast(Paragraph, result.children[0]).children[0])
+        assert text.content == "HI"
+
+    def test_visit_table_cells_with_overridden_visit(self) -> None:
+        """Test that a visitor overriding visit() still reaches table cells."""
+
+        class UpperVisit(NodeVisitor):
+            def visit(self, node: AnyNode) -> AnyNode:
+                if isinstance(node, Text):
+                    return Text(content=node.content.upper())
+                return super().visit(node)
+
+        assert not UpperVisit._TABLE_SAFE
+        table = Table(header=[[Text(content="h")]], rows=[[[Text(content="c")]]])
+        result = cast(Table, transform_ast(table, UpperVisit()))
+        assert cast(Text, result.header[0][0]).content == "H"
+        assert cast(Text, result.rows[0][0][0]).content == "C"